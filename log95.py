@@ -17,6 +17,23 @@ class log95Levels(Enum):
     WARN = 4
     INFO = 5
 
+def level_to_str(_level: log95Levels, _color: bool) -> LiteralString | str:
+    if _color:
+        match _level:
+            case log95Levels.VERBOSE: return f"{colorama.Fore.LIGHTWHITE_EX}VERBOSE{colorama.Fore.RESET}"
+            case log95Levels.CRITICAL_ERROR: return f"{colorama.Fore.RED}CRITICAL{colorama.Fore.RESET}"
+            case log95Levels.ERROR: return f"{colorama.Fore.LIGHTRED_EX}ERROR{colorama.Fore.RESET}"
+            case log95Levels.WARN: return f"{colorama.Fore.YELLOW}WARN{colorama.Fore.RESET}"
+            case log95Levels.INFO: return f"{colorama.Fore.BLUE}INFO{colorama.Fore.RESET}"
+            case _: return _level.name
+    else:
+        match _level:
+            case log95Levels.CRITICAL_ERROR: return "CRITICAL"
+            case _: return _level.name
+
+# colorama is either imported above or not at all, so the label of every level is known up front
+LEVEL_STRINGS = {level: level_to_str(level, "colorama" in sys.modules) for level in log95Levels}
+
 def level_to_syslog(level: log95Levels):
     match level:
         case log95Levels.DEBUG: return sl.LOG_DEBUG
@@ -36,21 +53,7 @@ class log95:
         self.level = int(level.value)
         self.output = output
     def log(self, level: log95Levels, *args:str, seperator=" ") -> None:
-        we_have_color = "colorama" in sys.modules
-        def level_to_str(_level: log95Levels, _color: bool) -> LiteralString | str:
-            if _color:
-                match _level:
-                    case log95Levels.VERBOSE: return f"{colorama.Fore.LIGHTWHITE_EX}VERBOSE{colorama.Fore.RESET}"
-                    case log95Levels.CRITICAL_ERROR: return f"{colorama.Fore.RED}CRITICAL{colorama.Fore.RESET}"
-                    case log95Levels.ERROR: return f"{colorama.Fore.LIGHTRED_EX}ERROR{colorama.Fore.RESET}"
-                    case log95Levels.WARN: return f"{colorama.Fore.YELLOW}WARN{colorama.Fore.RESET}"
-                    case log95Levels.INFO: return f"{colorama.Fore.BLUE}INFO{colorama.Fore.RESET}"
-                    case _: return _level.name
-            else:
-                match _level:
-                    case log95Levels.CRITICAL_ERROR: return "CRITICAL"
-                    case _: return _level.name
-        if level.value > self.level: self.output.write(f"[{self.tag}] ({level_to_str(level, we_have_color)}) @ ({datetime.datetime.now().strftime('%d.%m.%Y %H:%M:%S.%f')}) - {seperator.join(args)}{os.linesep}")
+        if level.value > self.level: self.output.write(f"[{self.tag}] ({LEVEL_STRINGS[level]}) @ ({datetime.datetime.now().strftime('%d.%m.%Y %H:%M:%S.%f')}) - {seperator.join(args)}{os.linesep}")
         if isinstance(self.output, SyslogTextIO): self.output.syslog(level, seperator.join(args))
     def debug(self, *args:str, seperator=" ") -> None:
         self.log(log95Levels.DEBUG, *args, seperator)
@@ -1,4 +1,4 @@
-import log95, abc
+import log95, abc, threading
 from collections.abc import Sequence
 from typing import Literal
 from subprocess import Popen
@@ -6,7 +6,7 @@ from dataclasses import dataclass
 from pathlib import Path
 import tinytag
 
-@dataclass
+@dataclass(slots=True)
 class Track:
     path: Path
     fade_out: float
@@ -16,7 +16,7 @@ class Track:
     offset: float = 0.0
     focus_time_offset: float = 0.0 # Offset according to the duration
 
-@dataclass
+@dataclass(slots=True)
 class Process:
     process: Popen
     track: Track
@@ -35,6 +35,24 @@ class ABC_ProcessManager(abc.ABC):
     def wait_all(self, timeout: float | None = None) -> None: ...
     @abc.abstractmethod
     def test(self) -> bool: """Ran on startup. This should return false if this process manager can't play any track"""
+    def duration(self, path: Path) -> float | None:
+        """Duration of the file in seconds, process managers may override this to cache it"""
+        return tinytag.TinyTag.get(path, tags=False).duration
+    def bulk_durations(self, paths: list[Path]) -> dict[Path, float | None]:
+        """Durations of many files at once, ran in the background to warm up before a playlist plays. Files are read on a few threads so their I/O overlaps.
+        The threads are daemons, unlike a ThreadPoolExecutor's workers, so an unfinished warmup never holds up the exit"""
+        paths = list(dict.fromkeys(paths))
+        pending, lock, durations = iter(paths), threading.Lock(), {}
+        def worker():
+            while True:
+                with lock: path = next(pending, None)
+                if path is None: return
+                try: durations[path] = self.duration(path)
+                except Exception: durations[path] = None
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(8, len(paths)))]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        return {path: durations.get(path) for path in paths}
 class BaseIMCModule:
     """This is not a module to be used but rather a placeholder IMC api to be used in other modules"""
     def imc(self, imc: 'InterModuleCommunication') -> None:
@@ -45,7 +63,6 @@ class BaseIMCModule:
 class ProcmanCommunicator(BaseIMCModule):
     def __init__(self, procman: ABC_ProcessManager) -> None: 
         self.procman = procman
-        self.tinytag = tinytag.TinyTag()
     def imc(self, imc: 'InterModuleCommunication') -> None:
         super().imc(imc)
         self._imc.register(self, "procman")
@@ -57,7 +74,7 @@ class ProcmanCommunicator(BaseIMCModule):
 
             if int(op) == 0: return {"op": 0, "arg": "pong"}
             elif int(op) == 1:
-                if arg := data.get("arg"): return {"op": 1, "arg": self.tinytag.get(arg, tags=False).duration}
+                if arg := data.get("arg"): return {"op": 1, "arg": self.procman.duration(arg)}
                 else: return
             elif int(op) == 2:
                 self.procman.stop_all(data.get("timeout", None))
@@ -1,6 +1,6 @@
 from modules import BaseIMCModule, InterModuleCommunication
 from . import ActiveModifier, log95, Track, Path
-import os, glob, datetime
+import os, glob, datetime, fnmatch
 from threading import Lock
 DEFAULT_CROSSFADE = 6
 
@@ -40,20 +40,21 @@ class Module(ActiveModifier):
 
         if not self.playlist: return (track, next_track), False
 
-        with self.file_lock:
-            TOPLAY.touch()
-            with open(TOPLAY, "r") as f: songs = [s.strip() for s in f.readlines() if s.strip()]
-
+        dir_files: dict[str, list[str]] = {} # Each directory with patterns in it is listed once per call, rather than once per pattern
         def expand_song(s):
             prefix = '!' if s.startswith('!') else ''
             path = s.removeprefix('!')
-            if any(c in path for c in ('*', '?')):
-                return [(prefix + f) for f in glob.glob(path) if os.path.isfile(f)]
-            else:
-                return [(prefix + path)] if os.path.isfile(path) else []
+            if not any(c in path for c in ('*', '?')): return [(prefix + path)] if os.path.isfile(path) else []
+            directory, pattern = os.path.split(path)
+            if any(c in directory for c in ('*', '?')): return [(prefix + f) for f in glob.glob(path) if os.path.isfile(f)]
+            if (files := dir_files.get(directory)) is None:
+                try:
+                    with os.scandir(directory or ".") as it: files = [entry.name for entry in it if entry.is_file()]
+                except OSError: files = []
+                dir_files[directory] = files
+            if not pattern.startswith("."): files = [name for name in files if not name.startswith(".")] # Same as glob, hidden files need an explicit dot
+            return [(prefix + os.path.join(directory, name)) for name in fnmatch.filter(files, pattern)]
 
-        songs[:] = [result for s in songs for result in expand_song(s)]
-        
         def get_song(pop: bool = True):
             nonlocal songs
             if pop: song = songs.pop(0)
@@ -64,78 +65,85 @@ class Module(ActiveModifier):
                 official = False
             return Path(song).absolute(), official
 
-        if len(songs):
-            song, official = get_song()
-
-            if self.last_track: last_track_fade_out = self.last_track.fade_out
-            else:
-                if (index - 1) >= 0: last_track_fade_out = self.playlist[index - 1].fade_out
-                else: last_track_fade_out = 0.0
-
-            if not self.originals or self.originals[-1] != track: self.originals.append(track)
-
-            with self.file_lock:
-                with open(TOPLAY, "w") as f:
+        # Skipping a toplay song goes around this loop again instead of recursing into play()
+        while True:
+            song = None
+            # One handle for both the read and the rewrite, 'a+' also creates the file if it's missing (and writes after the truncate land at the start)
+            with self.file_lock, open(TOPLAY, "a+") as f:
+                f.seek(0)
+                songs = [s for s in map(str.strip, f) if s]
+                songs[:] = [result for s in songs for result in expand_song(s)]
+                if len(songs):
+                    song, official = get_song()
+                    f.truncate(0)
                     f.write('\n'.join(songs))
                     f.write("\n")
 
-            logger.info(f"Playing {song.name} instead, as instructed by toplay")
-
-            if len(songs):
-                # There are more tracks on the temp list
-                new_song, new_official = get_song(False)
-                current_track_fade_in = last_track_fade_out if official else 0
-                crossfade_amount = self.crossfade if official and new_official else 0
-                self.last_track = Track(song, crossfade_amount, current_track_fade_in, official, {}, focus_time_offset=-crossfade_amount)
-
-                next_track_fade_out = self.crossfade if new_official else 0
-                next_track = Track(new_song, next_track_fade_out, crossfade_amount, new_official, {}, focus_time_offset=-crossfade_amount)
-            else:
-                next_playlist_track_fade_in = next_track.fade_in if next_track else self.crossfade
-
-                current_track_fade_in = last_track_fade_out if official else 0
-                current_track_fade_out = next_playlist_track_fade_in if official else 0
-
-                self.last_track = Track(song, current_track_fade_out, current_track_fade_in, official, {}, focus_time_offset=-current_track_fade_out)
-                next_track = track
-            self.limit_tracks = False
+            if song:
+                if self.last_track: last_track_fade_out = self.last_track.fade_out
+                else:
+                    if (index - 1) >= 0: last_track_fade_out = self.playlist[index - 1].fade_out
+                    else: last_track_fade_out = 0.0
+
+                if not self.originals or self.originals[-1] != track: self.originals.append(track)
+
+                logger.info(f"Playing {song.name} instead, as instructed by toplay")
+
+                if len(songs):
+                    # There are more tracks on the temp list
+                    new_song, new_official = get_song(False)
+                    current_track_fade_in = last_track_fade_out if official else 0
+                    crossfade_amount = self.crossfade if official and new_official else 0
+                    self.last_track = Track(song, crossfade_amount, current_track_fade_in, official, {}, focus_time_offset=-crossfade_amount)
+
+                    next_track_fade_out = self.crossfade if new_official else 0
+                    next_track = Track(new_song, next_track_fade_out, crossfade_amount, new_official, {}, focus_time_offset=-crossfade_amount)
+                else:
+                    next_playlist_track_fade_in = next_track.fade_in if next_track else self.crossfade
+
+                    current_track_fade_in = last_track_fade_out if official else 0
+                    current_track_fade_out = next_playlist_track_fade_in if official else 0
+
+                    self.last_track = Track(song, current_track_fade_out, current_track_fade_in, official, {}, focus_time_offset=-current_track_fade_out)
+                    next_track = track
+                self.limit_tracks = False
+                if self.skip_next > 0:
+                    logger.info("Skipping...")
+                    self.skip_next -= 1
+                    continue
+                return (self.last_track, next_track), True
+            elif len(self.originals):
+                self.last_track = self.originals.pop(0)
+                if len(self.originals): next_track = self.originals[0]
+            else: self.last_track = track
+            self.limit_tracks = self.can_limit_tracks
+
+            if self.limit_tracks:
+                last_track_duration = self._imc.send(self, "procman", {"op": 1, "arg": self.last_track.path}) # Ask procman for the duration of this file
+                assert isinstance(last_track_duration, dict)
+                last_track_duration = last_track_duration.get("arg")
+                if last_track_duration:
+                    now = datetime.datetime.now()
+                    future = datetime.datetime.fromtimestamp(now.timestamp() + last_track_duration)
+                if last_track_duration and last_track_duration > 5*60:
+                    if now.hour < self.morning_start and future.hour >= self.morning_start:
+                        logger.warning("Skipping track as it bleeds into the morning")
+                        return (None, None), None
+                    elif now.hour < self.day_end and future.hour >= self.day_end:
+                        logger.warning("Skipping track as it bleeds into the night")
+                        return (None, None), None
+                    elif future.day != now.day: # late night goes mid day, as it starts at midnight
+                        logger.warning("Skipping track as it the next day")
+                        return (None, None), None
+                    if last_track_duration: logger.info("Track ends at", repr(future))
             if self.skip_next > 0:
-                logger.info("Skipping...")
+                logger.info("Skip next was more than 0, skipping this song.")
                 self.skip_next -= 1
-                return self.play(index, track, next_track)
-            return (self.last_track, next_track), True
-        elif len(self.originals):
-            self.last_track = self.originals.pop(0)
-            if len(self.originals): next_track = self.originals[0]
-        else: self.last_track = track
-        self.limit_tracks = self.can_limit_tracks
-
-        if self.limit_tracks:
-            last_track_duration = self._imc.send(self, "procman", {"op": 1, "arg": self.last_track.path}) # Ask procman for the duration of this file
-            assert isinstance(last_track_duration, dict)
-            last_track_duration = last_track_duration.get("arg")
-            if last_track_duration:
-                now = datetime.datetime.now()
-                future = datetime.datetime.fromtimestamp(now.timestamp() + last_track_duration)
-            if last_track_duration and last_track_duration > 5*60:
-                if now.hour < self.morning_start and future.hour >= self.morning_start:
-                    logger.warning("Skipping track as it bleeds into the morning")
-                    return (None, None), None
-                elif now.hour < self.day_end and future.hour >= self.day_end:
-                    logger.warning("Skipping track as it bleeds into the night")
-                    return (None, None), None
-                elif future.day != now.day: # late night goes mid day, as it starts at midnight
-                    logger.warning("Skipping track as it the next day")
-                    return (None, None), None
-                if last_track_duration: logger.info("Track ends at", repr(future))
-        if self.skip_next > 0:
-            logger.info("Skip next was more than 0, skipping this song.")
-            self.skip_next -= 1
-            return (None, None), None
-        if index in self.skip_indexes:
-            logger.info("Skipping...")
-            return (None, None), None
-        return (self.last_track, next_track), False
+                return (None, None), None
+            if index in self.skip_indexes:
+                logger.info("Skipping...")
+                return (None, None), None
+            return (self.last_track, next_track), False
 
     def imc(self, imc: InterModuleCommunication) -> None:
         super().imc(imc)
@@ -147,19 +155,17 @@ class Module(ActiveModifier):
             songs_to_add = data.get("songs")
             at_top = data.get("top", False)
             if isinstance(songs_to_add, list):
+                payload = "".join(f"\n{song_path}\n" for song_path in songs_to_add)
                 with self.file_lock:
                     if at_top:
-                        with open(TOPLAY, "r") as f: d = f.read()
-                        with open(TOPLAY, "w") as f:
-                            for song_path in songs_to_add: f.write(f"\n{song_path}\n")
-                            f.write(d)
+                        with open(TOPLAY, "r") as f: payload += f.read()
+                        with open(TOPLAY, "w") as f: f.write(payload)
                     else:
-                        with open(TOPLAY, "a") as f:
-                            for song_path in songs_to_add: f.write(f"\n{song_path}\n")
+                        with open(TOPLAY, "a") as f: f.write(payload)
                 return {"status": "ok", "message": f"{len(songs_to_add)} songs added."}
         elif data.get("action") == "get_toplay":
             with self.file_lock:
-                with open(TOPLAY, "r") as f: return {"status": "ok", "data": [i.strip() for i in f.readlines() if i.strip()]}
+                with open(TOPLAY, "r") as f: return {"status": "ok", "data": [i for i in map(str.strip, f) if i]}
         elif data.get("action") == "clear_toplay":
             with self.file_lock:
                 with open(TOPLAY, "w") as f: f.write("")
@@ -167,7 +173,7 @@ class Module(ActiveModifier):
         elif data.get("action") == "remove_toplay":
             targets = data.get("indexes", [])
             with self.file_lock:
-                with open(TOPLAY, "r") as f: lines = [l.strip() for l in f.readlines() if l.strip()]
+                with open(TOPLAY, "r") as f: lines = [l for l in map(str.strip, f) if l]
                 if isinstance(targets, list):
                     target_set = set(targets)
                     lines = [l for i, l in enumerate(lines) if i not in target_set]
@@ -176,7 +182,7 @@ class Module(ActiveModifier):
         elif data.get("action") == "toggle_official_toplay":
             targets = data.get("indexes", [])
             with self.file_lock:
-                with open(TOPLAY, "r") as f: lines = [l.strip() for l in f.readlines() if l.strip()]
+                with open(TOPLAY, "r") as f: lines = [l for l in map(str.strip, f) if l]
                 if isinstance(targets, list):
                     target_set = set(targets)
                     for i in target_set:
@@ -6,7 +6,7 @@ LATE_NIGHT_START = 0
 LATE_NIGHT_END = 5
 
 from . import BaseIMCModule, InterModuleCommunication, PlaylistAdvisor, log95, Path
-import os, datetime
+import os, datetime, time
 
 from typing import TextIO
 _log_out: TextIO
@@ -15,6 +15,7 @@ assert _log_out # pyright: ignore[reportUnboundVariable]
 logger = log95.log95("ADVISOR", output=_log_out)
 
 playlist_dir = Path("/home/user/mixes/.playlist")
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday") # Indexed by weekday(), the same names strftime('%A') gives in the C locale
 
 class Time:
     @staticmethod
@@ -22,35 +23,36 @@ class Time:
         try: return os.path.getmtime(playlist_path)
         except OSError: return 0
 
-def check_if_playlist_modifed(playlist_path: Path) -> bool:
-    current_day, current_hour = (time := datetime.datetime.now()).strftime('%A').lower(), time.hour
+period_paths_cache: dict[str, dict[str, Path]] = {}
 
-    if DAY_START <= current_hour < DAY_END:
-        day_playlist_path = Path(playlist_dir, current_day, "day").absolute()
-        if playlist_path != day_playlist_path:
-            logger.info("Time changed to day hours, switching playlist...")
-            return True
-    elif MORNING_START <= current_hour < MORNING_END:
-        morning_playlist_path = Path(playlist_dir, current_day, "morning").absolute()
-        if playlist_path != morning_playlist_path:
-            logger.info("Time changed to morning hours, switching playlist...")
-            return True
-    elif LATE_NIGHT_START <= current_hour < LATE_NIGHT_END:
-        late_night_playlist_path = Path(playlist_dir, current_day, "late_night").absolute()
-        if playlist_path != late_night_playlist_path:
-            logger.info("Time changed to late night hours, switching playlist...")
-            return True
-    else:
-        night_playlist_path = Path(playlist_dir, current_day, "night").absolute()
-        if playlist_path != night_playlist_path:
-            logger.info("Time changed to night hours, switching playlist...")
-            return True
+def get_period_paths(day: str) -> dict[str, Path]:
+    """Playlist path of every period of the day, only built once for each day of the week"""
+    if (paths := period_paths_cache.get(day)) is None: paths = period_paths_cache[day] = {period: Path(playlist_dir, day, period) for period in ("late_night", "morning", "day", "night")}
+    return paths
+
+def next_hour_timestamp() -> float:
+    return (datetime.datetime.now().replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)).timestamp()
+
+def get_period(hour: int) -> str:
+    """Period of the day the hour falls into, the same one picks the playlist in advise and is checked for against it later"""
+    if DAY_START <= hour < DAY_END: return "day"
+    elif MORNING_START <= hour < MORNING_END: return "morning"
+    elif LATE_NIGHT_START <= hour < LATE_NIGHT_END: return "late_night"
+    return "night"
+
+def check_if_playlist_modifed(playlist_path: Path) -> bool:
+    now = datetime.datetime.now()
+    period = get_period(now.hour)
+    if playlist_path != get_period_paths(WEEKDAYS[now.weekday()])[period]:
+        logger.info(f"Time changed to {period.replace('_', ' ')} hours, switching playlist...")
+        return True
     return False
 
 class Module(PlaylistAdvisor):
     def __init__(self) -> None:
         self.last_mod_time = 0
         self.last_playlist = None
+        self.period_check_at = 0.0 # Periods (and days) only change on the hour, so the period check is skipped until then
 
         self.custom_playlist = None
         self.custom_playlist_path = Path("/tmp/radioPlayer_list")
@@ -65,63 +67,52 @@ class Module(PlaylistAdvisor):
             return self.custom_playlist
         elif self.custom_playlist: self.custom_playlist = None
 
-        current_day, current_hour = (time := datetime.datetime.now()).strftime('%A').lower(), time.hour
+        current_day, current_hour = WEEKDAYS[(now := datetime.datetime.now()).weekday()], now.hour
 
-        morning_playlist = Path(playlist_dir, current_day, "morning").absolute()
-        day_playlist = Path(playlist_dir, current_day, "day").absolute()
-        night_playlist = Path(playlist_dir, current_day, "night").absolute()
-        late_night_playlist = Path(playlist_dir, current_day, "late_night").absolute()
+        period_paths = get_period_paths(current_day)
 
-        morning_dir = morning_playlist.parent
-        day_dir = day_playlist.parent
-        night_dir = night_playlist.parent
-        late_night_dir = late_night_playlist.parent
+        # All four share the day's directory, creating directly (and catching the exists error) replaces the exists check before each
+        day_dir = period_paths["day"].parent
+        try:
+            day_dir.mkdir()
+            logger.info(f"Creating directory: {day_dir}")
+        except FileExistsError: pass
 
-        for dir_path in [morning_dir, day_dir, night_dir, late_night_dir]:
-            if not dir_path.exists():
-                logger.info(f"Creating directory: {dir_path}")
-                dir_path.mkdir(exist_ok=True)
-
-        for playlist_path in [morning_playlist, day_playlist, night_playlist, late_night_playlist]:
-            if not playlist_path.exists():
+        for playlist_path in period_paths.values():
+            try:
+                os.close(os.open(playlist_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
                 logger.info(f"Creating empty playlist: {playlist_path}")
-                playlist_path.touch()
-
-        if DAY_START <= current_hour < DAY_END:
-            logger.info(f"Playing {current_day} day playlist...")
-            self.last_mod_time = Time.get_playlist_modification_time(day_playlist)
-            self.last_playlist = day_playlist
-        elif MORNING_START <= current_hour < MORNING_END:
-            logger.info(f"Playing {current_day} morning playlist...")
-            self.last_mod_time = Time.get_playlist_modification_time(morning_playlist)
-            self.last_playlist = morning_playlist
-        elif LATE_NIGHT_START <= current_hour < LATE_NIGHT_END:
-            logger.info(f"Playing {current_day} late night playlist...")
-            self.last_mod_time = Time.get_playlist_modification_time(late_night_playlist)
-            self.last_playlist = late_night_playlist
-        else:
-            logger.info(f"Playing {current_day} night playlist...")
-            self.last_mod_time = Time.get_playlist_modification_time(night_playlist)
-            self.last_playlist = night_playlist
+            except FileExistsError: pass
+
+        period = get_period(current_hour)
+        logger.info(f"Playing {current_day} {period.replace('_', ' ')} playlist...")
+        self.last_playlist = period_paths[period]
+        self.last_mod_time = Time.get_playlist_modification_time(self.last_playlist)
+        self.period_check_at = next_hour_timestamp()
         if self._imc: self._imc.send(self, "web", {"playlist": str(self.last_playlist)})
         return self.last_playlist
     def new_playlist(self) -> bool:
-        if self.custom_playlist and self.custom_playlist_path.exists():
-            if Time.get_playlist_modification_time(self.custom_playlist) > self.custom_playlist_last_mod:
+        # This runs between every track, so each trigger file costs a single syscall: a stat for the custom playlist and an unlink for the reload flag
+        try: custom_playlist_mod = os.stat(self.custom_playlist_path).st_mtime
+        except OSError: custom_playlist_mod = None
+        if self.custom_playlist and custom_playlist_mod is not None:
+            if custom_playlist_mod > self.custom_playlist_last_mod:
                 logger.info("Custom playlist changed on disc, reloading...")
                 self.custom_playlist = None
                 return True
             return False
-        elif self.custom_playlist_path.exists(): return True
+        elif custom_playlist_mod is not None: return True
 
         if not self.last_playlist: return True
 
-        reload_state = (playlist_dir / "reload")
-        if reload_state.exists():
-            reload_state.unlink(True)
+        try:
+            (playlist_dir / "reload").unlink()
             return True
+        except FileNotFoundError: pass
 
-        if check_if_playlist_modifed(self.last_playlist): return True
+        if time.time() >= self.period_check_at:
+            if check_if_playlist_modifed(self.last_playlist): return True
+            self.period_check_at = next_hour_timestamp()
         if Time.get_playlist_modification_time(self.last_playlist) > self.last_mod_time:
             logger.info("Playlist changed on disc, reloading...")
             return True
@@ -2,14 +2,13 @@ from . import PlaylistModifierModule, Track
 DEFAULT_CROSSFADE = 6.0
 class Module(PlaylistModifierModule):
     def modify(self, global_args: dict, playlist: list[Track]) -> list[Track] | None:
-        out = []
+        # This runs first on the freshly parsed tracks, so they're updated in place rather than copied
         for track in playlist:
-            do_cross_fade = track.official
             track_crossfade = float(track.args.get("crossfade", DEFAULT_CROSSFADE) if track.args else DEFAULT_CROSSFADE) or DEFAULT_CROSSFADE
-            if do_cross_fade and track_crossfade:
-                out.append(Track(track.path, track_crossfade, track_crossfade, do_cross_fade, track.args, focus_time_offset=-track_crossfade))
-            else: out.append(track)
-        return out
+            if track.official and track_crossfade:
+                track.fade_out = track.fade_in = track_crossfade
+                track.focus_time_offset = -track_crossfade
+        return playlist
 playlistmod = Module(), 0
 
 # This is free and unencumbered software released into the public domain.
@@ -1,19 +1,28 @@
-from . import ABC_ProcessManager, Process, Track, Popen, tinytag, RejectedTrack
-from threading import Lock
-import subprocess, time
+from . import ABC_ProcessManager, Process, Track, Popen, tinytag, RejectedTrack, Path
+from collections import deque
+import subprocess, time, shutil, json, os, threading
+
+DURATIONS_FILE = Path("/home/user/mixes/.playlist/durations.json")
+FFPLAY_ARGS = ('-nodisp', '-hide_banner', '-autoexit', '-loglevel', 'quiet')
 
 class ProcessManager(ABC_ProcessManager):
     def __init__(self) -> None:
-        self.lock = Lock()
-        self.processes: list[Process] = []
+        # deque appends, pops and removes are atomic, so the player thread and the IMC callers (skips from the web) share it without a lock
+        self.processes: deque[Process] = deque()
         self.tinytag = tinytag.TinyTag()
+        self.ffplay = shutil.which("ffplay") or "ffplay" # Resolved once, so the spawn of every track doesn't search PATH again
+        self.ffprobe = shutil.which("ffprobe")
+        self.durations = self._load_durations()
+        self.durations_lock = threading.Lock() # Guards the save timer, the playlist warmup adds durations from its own thread
+        self.save_timer: threading.Timer | None = None
         
     def play(self, track: Track) -> Process:
         if track.path.suffix not in self.tinytag.SUPPORTED_FILE_EXTENSIONS or not track.path.exists(): raise RejectedTrack
-        cmd = ['ffplay', '-nodisp', '-hide_banner', '-autoexit', '-loglevel', 'quiet']
+        cmd = [self.ffplay, *FFPLAY_ARGS]
 
-        duration = self.tinytag.get(track.path.absolute(), tags=False).duration
-        if not duration: raise Exception("Failed to get file duration for", track.path)
+        path = track.path.absolute() # Resolved once for both the duration lookup and the command line
+        duration = self.duration(path)
+        if not duration: raise RejectedTrack("Failed to get file duration for", track.path) # Skipped by the core rather than ending the playlist
         if track.offset >= duration: track.offset = max(duration - 0.1, 0)
         if track.offset > 0: cmd.extend(['-ss', str(track.offset)])
 
@@ -21,42 +30,82 @@ class ProcessManager(ABC_ProcessManager):
         if track.fade_in != 0: filters.append(f"afade=t=in:st=0:d={track.fade_in}")
         if track.fade_out != 0: filters.append(f"afade=t=out:st={duration - track.fade_out}:d={track.fade_out}")
         if filters: cmd.extend(['-af', ",".join(filters)])
-        cmd.append(str(track.path.absolute()))
+        cmd.append(str(path))
 
-        pr = Process(Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True), track, time.monotonic(), duration - track.offset)
-        with self.lock: self.processes.append(pr)
+        pr = Process(Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True), track, time.monotonic(), duration - track.offset)
+        self.processes.append(pr)
         return pr
+    def _load_durations(self) -> dict[str, list]:
+        try:
+            with open(DURATIONS_FILE, "r") as f: return json.load(f)
+        except Exception: return {}
+    def _save_durations(self) -> None:
+        with self.durations_lock:
+            self.save_timer = None
+            try:
+                temp_file = DURATIONS_FILE.with_suffix(".tmp")
+                with open(temp_file, "w") as f: json.dump(self.durations, f)
+                os.replace(temp_file, DURATIONS_FILE)
+            except Exception: pass
+    def _schedule_save(self) -> None:
+        """New durations are written out together 5 seconds after the first of them, the timer isn't a daemon so they're still written on exit"""
+        with self.durations_lock:
+            if self.save_timer: return
+            self.save_timer = threading.Timer(5, self._save_durations)
+            self.save_timer.start()
+    def duration(self, path: Path) -> float | None:
+        """Duration of the file, kept on disk across restarts and keyed by the file's mtime and size so a changed file is read again"""
+        key = str(path)
+        try: stat = os.stat(key)
+        except OSError: return None
+        if (cached := self.durations.get(key)) and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size: return cached[2]
+        try: duration = self.tinytag.get(key, tags=False).duration
+        except Exception: duration = None
+        if not duration: duration = self._probe_duration(key)
+        if duration:
+            with self.durations_lock: self.durations[key] = [stat.st_mtime_ns, stat.st_size, duration]
+            self._schedule_save()
+        return duration
+    def _probe_duration(self, path: str) -> float | None:
+        """Fallback for files tinytag can't read the duration of, this spawns a ffprobe so it's only used when the header read failed"""
+        if not self.ffprobe: return None
+        # The first try only reads about the first second and megabyte, oddly muxed files that need more get an unbounded probe
+        for bounds in (("-probesize", "1000000", "-analyzeduration", "1000000", "-read_intervals", "%+1"), ()):
+            try: duration = float(subprocess.run([self.ffprobe, "-v", "quiet", *bounds, "-show_entries", "format=duration", "-of", "csv=p=0", path], capture_output=True, text=True, timeout=10).stdout.strip())
+            except (subprocess.TimeoutExpired, ValueError, OSError): continue
+            if duration > 0: return duration
+        return None
+    def _take(self) -> Process | None:
+        try: return self.processes.popleft()
+        except IndexError: return None
     def anything_playing(self) -> bool:
-        with self.lock:
-            alive = []
-            for p in self.processes:
-                if p.process.poll() is None: alive.append(p)
-                else:
-                    try: p.process.wait(timeout=0)
-                    except subprocess.TimeoutExpired: pass
-            self.processes = alive
-            return bool(alive)
+        for p in tuple(self.processes): # A snapshot, as stop_all can take from the deque mid-iteration (which would make iterating it directly raise)
+            if p.process.poll() is not None: # poll already reaped it, and latches the return code so it's not asked again
+                try: self.processes.remove(p)
+                except ValueError: pass # Already taken by stop_all or wait_all
+        return bool(self.processes)
     def stop_all(self, timeout: float | None = None) -> None:
-        with self.lock:
-            for process in self.processes:
-                process.process.terminate()
-                try: process.process.wait(timeout)
-                except subprocess.TimeoutExpired: process.process.kill()
-            self.processes.clear()
+        # Every player is signalled before waiting on any, so they all shut down together instead of one timeout after another
+        stopping = []
+        while (process := self._take()):
+            process.process.terminate()
+            stopping.append(process)
+        for process in stopping:
+            try: process.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                process.process.kill()
+                process.process.wait()
     def wait_all(self, timeout: float | None = None) -> None:
-        with self.lock:
-            for process in self.processes:
-                try: process.process.wait(timeout)
-                except subprocess.TimeoutExpired: process.process.terminate()
-            self.processes.clear()
+        while (process := self._take()):
+            try: process.process.wait(timeout)
+            except subprocess.TimeoutExpired: process.process.terminate()
     def test(self) -> bool:
-        proc = subprocess.Popen(["ffplay"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-        start = time.monotonic()
-        while proc.poll() is None and (time.monotonic() - start) < 10: time.sleep(0.01)
-
-        if proc.poll() is None: proc.kill()
-        return proc.poll() not in (None, 127)
+        proc = subprocess.Popen([self.ffplay], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try: return proc.wait(10) != 127
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            return False
 
 procman = ProcessManager()
 
@@ -1,4 +1,5 @@
 import glob as glob_module
+import os, fnmatch
 from . import log95, Path, PlaylistParser
 
 _log_out: log95.TextIO
@@ -9,47 +10,79 @@ def _parse_args(text: str) -> dict[str, str]:
         line = line.strip()
         if not line or line.startswith(";") or line.startswith("#"): continue
         if "=" in line:
-            key, val = line.split("=", 1)
+            key, _, val = line.partition("=")
             args[key.strip()] = val.strip()
         else: args[line] = True
     return args
 
+def _walk_files(directory: str, seen: set[tuple[int, int]] | None = None) -> list[str]:
+    """Every file under the directory, like a recursive glob of ** but the file checks come from the scandir entries instead of a stat per path.
+    Symlinked directories are followed but every real directory is only walked once, unreadable ones are skipped like glob does"""
+    if seen is None: seen = set()
+    files = []
+    try:
+        stat = os.stat(directory)
+        if (stat.st_dev, stat.st_ino) in seen: return files
+        seen.add((stat.st_dev, stat.st_ino))
+        with os.scandir(directory) as it: entries = list(it)
+    except OSError: return files
+    for entry in entries:
+        if entry.name.startswith("."): continue # ** skips hidden entries
+        if entry.is_file(): files.append(entry.path)
+        elif entry.is_dir(): files.extend(_walk_files(entry.path, seen))
+    return files
+
 class FSDBParser(PlaylistParser):
     def __init__(self, ref_dir: Path) -> None:
         self.logger = log95.log95("FSDB", output=_log_out)
         self.ref_dir = ref_dir.resolve().absolute()
+        self.args_cache: dict[str, tuple[int, int, dict[str, str]]] = {} # path -> (mtime, size, args)
+
+    def _read_args(self, path: Path) -> dict[str, str]:
+        """Parsed args of the file, only read again once its mtime or size changes. Missing or empty files have no args"""
+        try: stat = os.stat(path)
+        except FileNotFoundError: return {}
+        if not stat.st_size: return {}
+        key = str(path)
+        if (cached := self.args_cache.get(key)) and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size: return cached[2]
+        args = _parse_args(path.read_text())
+        self.args_cache[key] = (stat.st_mtime_ns, stat.st_size, args)
+        return args
 
     def parse(self, playlist_path: Path) -> tuple[dict[str, str], list[tuple[list[str], dict[str, str]]]]:
         if not playlist_path.is_dir():
             self.logger.error(f"Playlist path is not a directory: {playlist_path}")
             raise Exception("Playlist directory doesn't exist")
 
-        global_args = {}
-        if (global_args_file := playlist_path / ".args.txt").exists():
-            global_args = _parse_args(global_args_file.read_text())
+        global_args = self._read_args(playlist_path / ".args.txt")
 
         out = []
+        ref_entries: dict[str, os.DirEntry] | None = None
         for entry in sorted(playlist_path.iterdir()):
             if entry.name.startswith("."): continue
 
             if entry.is_file():
-                real = self.ref_dir / entry.name
-                files = [f for f in glob_module.glob(str(real)) if Path(f).is_file()]
+                # ref_dir is listed once per parse, every file entry is then matched against that listing rather than globbing the directory again
+                if ref_entries is None:
+                    with os.scandir(self.ref_dir) as it: ref_entries = {i.name: i for i in it if not i.name.startswith(".")}
+                if glob_module.has_magic(entry.name): names = fnmatch.filter(ref_entries, entry.name)
+                else: names = [entry.name] if entry.name in ref_entries else []
+                files = [str(self.ref_dir / name) for name in names if ref_entries[name].is_file()]
                 if not files:
                     self.logger.warning(f"No match in ref_dir for: {entry.name}")
                     continue
-                args = _parse_args(entry.read_text()) if entry.stat().st_size > 0 else {}
+                args = self._read_args(entry)
                 out.append((files, args))
             elif entry.is_dir():
                 real_dir = self.ref_dir / entry.name
                 if not real_dir.is_dir():
                     self.logger.warning(f"No matching directory in ref_dir for: {entry.name}")
                     continue
-                files = [f for f in glob_module.glob(str(real_dir / "**"), recursive=True) if Path(f).is_file()]
+                files = _walk_files(str(real_dir))
                 if not files:
                     self.logger.warning(f"No files found under ref_dir for group: {entry.name}")
                     continue
-                args = _parse_args((entry / ".args.txt").read_text()) if (entry / ".args.txt").exists() else {}
+                args = self._read_args(entry / ".args.txt")
                 out.append((files, args))
 
         return global_args, out
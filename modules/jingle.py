@@ -6,23 +6,34 @@ Takes an file argument to initialize, which is the absolute path to the jingle f
 Reacts to the 'no_jingle' argument, for global usage it does not add jingles to the playlist, and for file usage it does not add the jingle after the file
 """
 
-import random
+import random, os
 
 from modules import BaseIMCModule, InterModuleCommunication
 
 from . import PlaylistModifierModule, Track, Path, PlayerModule
 
+JINGLE_DIR = Path("/home/user/mixes/.playlist/jingle")
+
+jingles_cache: tuple[int, Path, list[Path]] | None = None
+
 def get_jingles():
+    """The jingle directory is only listed again once its modification time changes"""
+    global jingles_cache
+    mtime = os.stat(JINGLE_DIR).st_mtime_ns
+    if jingles_cache and jingles_cache[0] == mtime: return jingles_cache[1], jingles_cache[2]
     master: Path | None = None
     jingles: list[Path] = []
-    for file in Path("/home/user/mixes/.playlist/jingle").iterdir():
-        if not (file.is_file() and file.exists()): continue
-        name, _ = file.name.rsplit('.', 1)
-        if name.lower() == "master":
-            master = file
-            continue
-        jingles.append(file)
+    with os.scandir(JINGLE_DIR) as it:
+        for entry in it:
+            if not entry.is_file(): continue # Taken from the directory listing, is_file already implies it exists
+            name, _ = entry.name.rsplit('.', 1)
+            file = Path(entry.path)
+            if name.lower() == "master":
+                master = file
+                continue
+            jingles.append(file)
     if not master: master = jingles.pop(0)
+    jingles_cache = (mtime, master, jingles)
     return master, jingles
 
 def chance(one_in_n): return random.randint(1, one_in_n) == 1
@@ -1,3 +1,4 @@
+import os
 from . import log95, PlayerModule, Track, Path
 _log_out: log95.TextIO
 assert _log_out # pyright: ignore[reportUnboundVariable]
@@ -8,11 +9,23 @@ def load_dict_from_custom_format(file_path: str | Path) -> dict[str, str]:
         with open(file_path, 'r') as file:
             for line in file:
                 if line.strip() == "" or line.startswith(";"): continue
-                key, value = line.split(':', 1)
-                result_dict[key.strip()] = value.strip()
+                key, sep, value = line.partition(':')
+                if sep: result_dict[key.strip()] = value.strip()
         return result_dict
     except FileNotFoundError: return {}
 
+def existing_paths(paths) -> set[str]:
+    """Which of the paths exist, from one listing of every parent directory instead of a stat per path"""
+    by_dir: dict[str, list[str]] = {}
+    for path in paths: by_dir.setdefault(os.path.dirname(path), []).append(path)
+    existing = set()
+    for directory, dir_paths in by_dir.items():
+        try:
+            with os.scandir(directory or ".") as it: names = {entry.name for entry in it}
+        except OSError: continue
+        existing.update(path for path in dir_paths if os.path.basename(path) in names)
+    return existing
+
 class Module(PlayerModule):
     def __init__(self) -> None:
         self.logger = log95.log95("PlayCnt", output=_log_out) # That sounds bad...
@@ -27,9 +40,8 @@ class Module(PlayerModule):
     def _save_counts(self) -> None:
         try:
             temp_file = self.file.with_suffix('.tmp')
-            with open(temp_file, 'w') as f:
-                for k, v in sorted(self.counts.items()):
-                    if Path(k).exists(): f.write(f"{k}:{v}\n")
+            existing = existing_paths(self.counts)
+            with open(temp_file, 'w') as f: f.writelines(f"{k}:{v}\n" for k, v in sorted(self.counts.items()) if k in existing)
             temp_file.replace(self.file)
         except Exception as e: self.logger.error(f"Failed to write play counts: {e}")
     def on_new_track(self, index: int, track: Track, next_track: Track | None) -> None:
@@ -10,7 +10,7 @@ def load_play_counts(file_path: Path) -> dict[str, int]:
             for line in file:
                 if line.strip() == "" or line.startswith(";"): continue
                 try:
-                    key, value = line.split(':', 1)
+                    key, _, value = line.partition(':')
                     counts[key.strip()] = int(value.strip())
                 except ValueError: continue
         return counts
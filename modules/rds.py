@@ -1,7 +1,7 @@
 from modules import InterModuleCommunication
 
 from . import PlayerModule, log95, Track
-import socket
+import socket, os
 
 # https://github.com/chrko/python-uecp
 import uecp.frame
@@ -45,19 +45,41 @@ logger = log95.log95("RDS", logger_level, output=_log_out)
 
 def load_dict_from_custom_format(file_path: str) -> dict[str, str]:
     try:
-        result_dict = {}
-        with open(file_path, 'r') as file:
-            for line in file:
-                if line.strip() == "" or line.startswith(";"): continue
-                key, value = line.split(':', 1)
-                result_dict[key.strip()] = value.strip()
-        return result_dict
+        with open(file_path, 'r') as file: lines = file.read().splitlines()
+        return {key.strip(): value.strip() for key, sep, value in (line.partition(':') for line in lines if line.strip() and not line.startswith(";")) if sep}
     except FileNotFoundError:
         logger.error(f"{name_table_path} does not exist, or could not be accesed")
         return {}
 
+name_table_cache: tuple[tuple[int, int] | None, dict[str, str]] = (None, {})
+
+def get_name_table() -> dict[str, str]:
+    """The name table is only parsed again when its modification time or size changes, a missing table is tried (and logged) once until it appears"""
+    global name_table_cache
+    try: key = ((stat := os.stat(name_table_path)).st_mtime_ns, stat.st_size)
+    except OSError: key = (0, 0)
+    if key != name_table_cache[0]: name_table_cache = (key, load_dict_from_custom_format(name_table_path))
+    return name_table_cache[1]
+
+rds_socket: socket.socket | None = None
+
+def send_rds(data: bytes) -> None:
+    """Sends over one socket kept for all the tracks, which is made again once if sending fails"""
+    global rds_socket
+    for attempt in range(2):
+        if rds_socket is None:
+            rds_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            rds_socket.settimeout(1.0)
+        try:
+            rds_socket.sendto(data, udp_host)
+            return
+        except OSError:
+            rds_socket.close()
+            rds_socket = None
+            if attempt: raise
+
 def update_rds(track_name: str):
-    name_table = load_dict_from_custom_format(name_table_path)
+    name_table = get_name_table()
     try:
         name = name_table[track_name]
         has_name = True
@@ -68,12 +90,8 @@ def update_rds(track_name: str):
 #    name = re.sub(r'^\s*\d+\s*[-.]?\s*', '', name)
 
     if " - " in name:
-        count = name.count(" - ")
-        while count != 1: # youtube reuploads, to avoid things like ilikedick123 - Micheal Jackson - Smooth Criminal
-            name = name.split(" - ", 1)[1]
-            count = name.count(" - ")
-        artist = name.split(" - ", 1)[0]
-        title = name.split(" - ", 1)[1]
+        # youtube reuploads, to avoid things like ilikedick123 - Micheal Jackson - Smooth Criminal only the last two parts are kept
+        artist, title = name.split(" - ")[-2:]
     else:
         artist = rds_default_artist
         title = name
@@ -109,15 +127,13 @@ def update_rds(track_name: str):
     prt = prt[:64]
 
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as f:
-            f.settimeout(1.0)
-            uecp_frame = uecp.frame.UECPFrame()
-            uecp_frame.add_command(RT_Set(prt))
-            uecp_frame.add_command(ASCII(f"RTP={rtp_str}".encode()))
-
-            data = uecp_frame.encode()
-            f.sendto(data, udp_host)
-            logger.debug("Sending", str(data))
+        uecp_frame = uecp.frame.UECPFrame()
+        uecp_frame.add_command(RT_Set(prt))
+        uecp_frame.add_command(ASCII(f"RTP={rtp_str}".encode()))
+
+        data = uecp_frame.encode()
+        send_rds(data)
+        logger.debug("Sending", str(data))
     except Exception as e: logger.error(f"Error updating RDS: {e}")
 
     return prt.decode("radiodatasystem", "ignore"), rtp_str
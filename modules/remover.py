@@ -1,37 +1,63 @@
 from . import PlaylistModifierModule, Track, PlayerModule
 from pathlib import Path
+from typing import TextIO
 import datetime
 
 PLAYED_FILE = Path("/home/user/mixes/.playlist/played.txt")
 
 played_tracks: set[Path] = set()
+played_handle: TextIO | None = None
+saved_day: int | None = None
 
 def get_day():
     t = datetime.datetime.now()
     return t.day + (t.month * 100)
 
 def load_played():
+    global saved_day
     if not PLAYED_FILE.exists(): return
     lines = PLAYED_FILE.read_text().splitlines()
     if not lines: return
-    try: saved_day = int(lines[0])
+    try: day = int(lines[0])
     except ValueError: return
-    if saved_day != get_day(): return  # Different day, discard
+    if day != get_day(): return  # Different day, discard
+    saved_day = day
     for line in lines[1:]:
         if line: played_tracks.add(Path(line))
 
+def read_saved_day() -> int | None:
+    """Only the first line of the played file, which holds the day, is read"""
+    try:
+        with open(PLAYED_FILE) as f: return int(f.readline())
+    except (OSError, ValueError): return None
+
+def close_played():
+    global played_handle
+    if played_handle:
+        played_handle.close()
+        played_handle = None
+
 def save_played():
+    global saved_day
+    close_played()
     PLAYED_FILE.parent.mkdir(parents=True, exist_ok=True)
-    lines = [str(get_day())] + [str(p) for p in played_tracks]
+    saved_day = get_day()
+    lines = [str(saved_day)] + [str(p) for p in played_tracks]
     PLAYED_FILE.write_text("\n".join(lines))
 
+def append_played(path: Path):
+    """Appends a single track to the played file, the whole file is only rewritten when the day changes"""
+    global played_handle
+    if saved_day != get_day(): return save_played()
+    if not played_handle: played_handle = open(PLAYED_FILE, "a")
+    played_handle.write(f"\n{path}")
+    played_handle.flush()
+
 load_played()
 
 class Module(PlaylistModifierModule):
     def modify(self, global_args: dict, playlist: list[Track]) -> list[Track] | None:
-        lines = PLAYED_FILE.read_text().splitlines() if PLAYED_FILE.exists() else []
-        saved_day = int(lines[0]) if lines else None
-        if saved_day != get_day():
+        if read_saved_day() != get_day():
             played_tracks.clear()
             save_played()
             return playlist
@@ -44,9 +70,10 @@ class Module(PlaylistModifierModule):
 
 class Module2(PlayerModule):
     def on_new_track(self, index: int, track: Track, next_track: Track | None) -> None:
-        if not track.official: return
+        if not track.official or track.path in played_tracks: return
         played_tracks.add(track.path)
-        save_played()
+        append_played(track.path)
+    def shutdown(self): close_played()
 
 playlistmod = Module(), 2
 module = Module2()
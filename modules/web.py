@@ -1,7 +1,7 @@
 import multiprocessing, os
-from queue import Empty
 import json
-import threading, uuid, time
+import threading, uuid
+from queue import Empty
 import asyncio
 import websockets, base64
 from websockets import ServerConnection, Request, Response, Headers
@@ -19,14 +19,36 @@ from . import Track, PlayerModule, Path, BaseIMCModule
 
 MAIN_PATH_DIR = Path("/home/user/mixes")
 
+UPGRADE_REQUIRED_BODY = b"WebSocket upgrade required\n"
+UPGRADE_REQUIRED_HEADERS = [("Connection", "Upgrade"), ("Upgrade", "websocket"), ("Content-Length", f"{len(UPGRADE_REQUIRED_BODY)}")]
+NOT_FOUND_BODY = b"Not Found\n"
+NOT_FOUND_HEADERS = [("Content-Length", f"{len(NOT_FOUND_BODY)}")]
+
+def track_to_api(track: Track) -> dict:
+    return {"path": str(track.path), "fade_out": track.fade_out, "fade_in": track.fade_in, "official": track.official, "args": track.args, "offset": track.offset, "focus_time_offset": track.focus_time_offset}
+
+dir_cache: dict[str, tuple[int, list[str], list[str]]] = {} # path -> (mtime, files, dirs), a directory's mtime changes whenever an entry is added, removed or renamed
+
+def list_dir(path: Path) -> tuple[list[str], list[str]]:
+    key = str(path)
+    mtime = os.stat(key).st_mtime_ns
+    if (cached := dir_cache.get(key)) and cached[0] == mtime: return cached[1], cached[2]
+    files, dirs = [], []
+    with os.scandir(key) as it:
+        for entry in it:
+            if entry.is_file(): files.append(entry.name)
+            elif entry.is_dir(): dirs.append(entry.name)
+    dir_cache[key] = (mtime, files, dirs)
+    return files, dirs
+
 # locks: dict[lock_id, websocket | None]  — managed inside the async runner's scope
 # passed into handlers via a shared dict reference
 
-async def ws_handler(websocket: ServerConnection, shared_data: dict, imc_q: multiprocessing.Queue, writer_q: asyncio.Queue, locks: dict, clients: set):
+async def ws_handler(websocket: ServerConnection, shared_data: dict, imc_q: multiprocessing.Queue, writer_q: asyncio.Queue, locks: dict, clients: set, pending: dict):
     try:
         initial = {
             "track": json.loads(shared_data.get("track", "{}")),
-            "dirs": {"files": [i.name for i in list(MAIN_PATH_DIR.iterdir()) if i.is_file()], "dirs": [i.name for i in list(MAIN_PATH_DIR.iterdir()) if i.is_dir()], "base": str(MAIN_PATH_DIR)},
+            "dirs": {"files": (listing := list_dir(MAIN_PATH_DIR))[0], "dirs": listing[1], "base": str(MAIN_PATH_DIR)},
             "locks": {lid: True for lid, owner in locks.items() if owner is not None},
         }
     except Exception: initial = {"track": {}, "dirs": {}, "locks": {}}
@@ -36,12 +58,11 @@ async def ws_handler(websocket: ServerConnection, shared_data: dict, imc_q: mult
 
     async def get_imc(name, data):
         key = str(uuid.uuid4())
+        future = pending[key] = asyncio.get_event_loop().create_future()
         imc_q.put({"name": name, "data": data, "key": key})
-        start = time.monotonic()
-        while time.monotonic() - start < 1:
-            if key in shared_data: return shared_data.pop(key)
-            await asyncio.sleep(0.1)
-        return None
+        try: return await asyncio.wait_for(future, 1)
+        except asyncio.TimeoutError: return None
+        finally: pending.pop(key, None)
 
     async def broadcast(payload: dict):
         msg = json.dumps(payload)
@@ -103,7 +124,7 @@ async def ws_handler(websocket: ServerConnection, shared_data: dict, imc_q: mult
                 what: str = msg.get("what", "")
                 try:
                     dir = Path(MAIN_PATH_DIR, what).resolve()
-                    payload = {"files": [i.name for i in list(dir.iterdir()) if i.is_file()], "base": str(dir), "dir": dir.name}
+                    payload = {"files": list_dir(dir)[0], "base": str(dir), "dir": dir.name}
                 except Exception: payload = {}
                 await websocket.send(json.dumps({"event": "request_dir", "data": payload}))
             elif action == "fsdb_add":
@@ -133,11 +154,8 @@ async def ws_handler(websocket: ServerConnection, shared_data: dict, imc_q: mult
                 except Exception as e: await websocket.send(json.dumps({"event": "fsdb_remove", "error": str(e)}))
             elif action == "fsdb_list":
                 try:
-                    p = Path(MAIN_PATH_DIR, ".playlist", msg.get("playlist", ""))
-                    payload = {
-                        "files": [i.name for i in p.iterdir() if i.is_file()],
-                        "dirs": [i.name for i in p.iterdir() if i.is_dir()]
-                    }
+                    files, dirs = list_dir(Path(MAIN_PATH_DIR, ".playlist", msg.get("playlist", "")))
+                    payload = {"files": files, "dirs": dirs}
                     await websocket.send(json.dumps({"event": "fsdb_list", "data": payload}))
                 except Exception as e: await websocket.send(json.dumps({"event": "fsdb_list", "data": {}, "error": str(e)}))
             elif action == "fm95": await writer_q.put((base64.b64decode(msg.get("data", "")), websocket))
@@ -172,14 +190,22 @@ async def ws_handler(websocket: ServerConnection, shared_data: dict, imc_q: mult
 async def broadcast_worker(ws_q: multiprocessing.Queue, clients: set):
     loop = asyncio.get_event_loop()
     while True:
-        msg: dict = await loop.run_in_executor(None, ws_q.get)
+        msg: dict | str | None = await loop.run_in_executor(None, ws_q.get)
         if msg is None: break
-        payload = json.dumps(msg)
+        payload = msg if isinstance(msg, str) else json.dumps(msg)
         if clients:
             coros = []
             for ws in list(clients): coros.append(_safe_send(ws, payload, clients, ws_q))
             await asyncio.gather(*coros)
 
+async def response_worker(imc_r_q: multiprocessing.Queue, pending: dict):
+    loop = asyncio.get_event_loop()
+    while True:
+        response: tuple[str, object] | None = await loop.run_in_executor(None, imc_r_q.get)
+        if response is None: break
+        key, out = response
+        if (future := pending.pop(key, None)) and not future.done(): future.set_result(out)
+
 async def _safe_send(ws, payload: str, clients: set, ws_q: multiprocessing.Queue):
     try: await ws.send(payload)
     except Exception:
@@ -188,9 +214,20 @@ async def _safe_send(ws, payload: str, clients: set, ws_q: multiprocessing.Queue
             await asyncio.get_event_loop().run_in_executor(None, ws_q.put, {"event": "users", "data": len(clients)})
         except Exception: pass
 
-def websocket_server_process(shared_data: dict, imc_q: multiprocessing.Queue, ws_q: multiprocessing.Queue):
+def load_static_files() -> dict[str, tuple[list[tuple[str, str]], bytes]]:
+    static_files = {}
+    for file in Path(__file__).parent.joinpath("web").iterdir():
+        if not file.is_file(): continue
+        data = file.read_bytes()
+        static_files["/" + file.name] = ([("Content-Type", get_content_type(file.name)), ("Content-Length", f"{len(data)}")], data)
+    if (file := static_files.get("/index.html")): static_files["/"] = ([("Content-Type", "text/html; charset=utf-8"), file[0][1]], file[1])
+    return static_files
+
+def websocket_server_process(shared_data: dict, imc_q: multiprocessing.Queue, ws_q: multiprocessing.Queue, imc_r_q: multiprocessing.Queue, client_count):
+    static_files = load_static_files() # path -> (headers, body), read once instead of on every request
     async def runner():
         clients: set[ServerConnection] = set()
+        pending: dict[str, asyncio.Future] = {}  # imc request key -> future resolved by the response worker
         locks: dict[int, ServerConnection | None] = {}  # lock_id -> owning websocket or None
         writer_q: asyncio.Queue[tuple[bytes | None, ServerConnection | None]] = asyncio.Queue()
 
@@ -244,38 +281,31 @@ def websocket_server_process(shared_data: dict, imc_q: multiprocessing.Queue, ws
 
         async def handler_wrapper(websocket: ServerConnection):
             clients.add(websocket)
+            client_count.value = len(clients)
             await asyncio.get_event_loop().run_in_executor(None, ws_q.put, {"event": "users", "data": len(clients)})
-            try: await ws_handler(websocket, shared_data, imc_q, writer_q, locks, clients)
+            try: await ws_handler(websocket, shared_data, imc_q, writer_q, locks, clients, pending)
             finally:
                 await websocket.close(1001, "")
                 clients.discard(websocket)
+                client_count.value = len(clients)
                 await asyncio.get_event_loop().run_in_executor(None, ws_q.put, {"event": "users", "data": len(clients)})
 
         async def process_request(websocket: ServerConnection, request: Request):
             if request.path == "/ws":
-                if not "upgrade" in request.headers.get("Connection", "").lower():
-                    return Response(
-                        426,
-                        "Upgrade Required",
-                        Headers([("Connection", "Upgrade"), ("Upgrade", "websocket")]),
-                        b"WebSocket upgrade required\n"
-                    )
+                if not "upgrade" in request.headers.get("Connection", "").lower(): return Response(426, "Upgrade Required", Headers(UPGRADE_REQUIRED_HEADERS), UPGRADE_REQUIRED_BODY)
                 return None
             else:
-                if request.path == "/" and (file := Path(__file__, "..", "web", "index.html").resolve()).exists():
-                    data = file.read_bytes()
-                    return Response(200, "OK", Headers([("Content-Type", "text/html; charset=utf-8"), ("Content-Length", f"{len(data)}")]), data)
-                elif (file := Path(__file__, "..", "web", request.path.removeprefix("/").strip()).resolve()).exists():
-                    data = file.read_bytes()
-                    return Response(200, "OK", Headers([("Content-Type", get_content_type(file.name)), ("Content-Length", f"{len(data)}")]), data)
-                else:
-                    data = b"Not Found\n"
-                    return Response(404, "Not Found", Headers([("Content-Length", f"{len(data)}")]), data)
+                if (file := static_files.get(request.path.strip())):
+                    headers, data = file
+                    return Response(200, "OK", Headers(headers), data)
+                else: return Response(404, "Not Found", Headers(NOT_FOUND_HEADERS), NOT_FOUND_BODY)
 
         server = await websockets.serve(handler_wrapper, "0.0.0.0", 3001, server_header="RadioPlayer ws plugin", process_request=process_request)
         broadcaster = asyncio.create_task(broadcast_worker(ws_q, clients))
         sockethand = asyncio.create_task(socket_handler_with_reconnect())
+        responder = asyncio.create_task(response_worker(imc_r_q, pending))
         await broadcaster
+        await responder
 
         await writer_q.put((None, None))
         await sockethand
@@ -292,18 +322,23 @@ class Module(PlayerModule):
         self.manager = multiprocessing.Manager()
         self.data = self.manager.dict()
         self.imc_q = multiprocessing.Queue()
+        self.imc_r_q = multiprocessing.Queue()
         self.ws_q = multiprocessing.Queue()
+        self.client_count = multiprocessing.Value("i", 0, lock=False) # Written only by the websocket process, lets progress skip the queue with nobody connected
 
         self.data["playlist"] = "[]"
         self.data["track"] = "{}"
-        self.data["progress"] = "{}"
         self.data["rds"] = "{}"
 
+        self.playlist: list[Track] = []
+        self.playlist_api: list[dict] = []
+        self.progress_track: tuple[Track, str] | None = None
+
         self.ipc_thread_running = True
         self.ipc_thread = threading.Thread(target=self._ipc_worker, daemon=True)
         self.ipc_thread.start()
 
-        self.ws_process = multiprocessing.Process(target=websocket_server_process, args=(self.data, self.imc_q, self.ws_q), daemon=False)
+        self.ws_process = multiprocessing.Process(target=websocket_server_process, args=(self.data, self.imc_q, self.ws_q, self.imc_r_q, self.client_count), daemon=False)
         self.ws_process.start()
         if os.name == "posix":
             try: os.setpgid(self.ws_process.pid, self.ws_process.pid)
@@ -311,37 +346,43 @@ class Module(PlayerModule):
 
     def _ipc_worker(self):
         while self.ipc_thread_running:
+            batch: list[dict | None] = [self.imc_q.get()]
             try:
-                message: dict | None = self.imc_q.get(timeout=0.5)
-                if message is None: break
-                out = self._imc.send(self, message["name"], message["data"])
-                if key := message.get("key", None): self.data[key] = out
-            except Empty: continue
-            except Exception: pass
+                # Drain whatever else arrived with the first message, so bursts are handled per wakeup rather than per message
+                while len(batch) < 32: batch.append(self.imc_q.get_nowait())
+            except Empty: pass
+            for message in batch:
+                if message is None: return
+                try:
+                    out = self._imc.send(self, message["name"], message["data"])
+                    if key := message.get("key", None): self.imc_r_q.put((key, out))
+                except Exception: pass
+
+    def _track_api(self, index: int, track: Track) -> dict:
+        # Tracks straight from the playlist were already converted in on_new_playlist, only the active modifier's substitutes need it here
+        if 0 <= index < len(self.playlist) and self.playlist[index] is track: return self.playlist_api[index]
+        return track_to_api(track)
 
     def on_new_playlist(self, playlist: list[Track], global_args: dict[str, str]) -> None:
-        api_data = []
-        for track in playlist:
-            api_data.append({"path": str(track.path), "fade_out": track.fade_out, "fade_in": track.fade_in, "official": track.official, "args": track.args, "offset": track.offset, "focus_time_offset": track.focus_time_offset})
+        self.playlist = playlist
+        self.playlist_api = api_data = [track_to_api(track) for track in playlist]
         output_data = {"playlist": api_data, "global_args": global_args}
         self.data["playlist"] = json.dumps(output_data)
         try: self.ws_q.put({"event": "playlist", "data": output_data})
         except Exception: pass
 
     def on_new_track(self, index: int, track: Track, next_track: Track | None) -> None:
-        track_data = {"path": str(track.path), "fade_out": track.fade_out, "fade_in": track.fade_in, "official": track.official, "args": track.args, "offset": track.offset, "focus_time_offset": track.focus_time_offset}
-        if next_track: next_track_data = {"path": str(next_track.path), "fade_out": next_track.fade_out, "fade_in": next_track.fade_in, "official": next_track.official, "args": next_track.args, "offset": next_track.offset, "focus_time_offset": next_track.focus_time_offset}
-        else: next_track_data = None
-        payload = {"index": index, "track": track_data, "next_track": next_track_data}
+        payload = {"index": index, "track": self._track_api(index, track), "next_track": self._track_api(index + 1, next_track) if next_track else None}
         self.data["track"] = json.dumps(payload)
         try: self.ws_q.put({"event": "new_track", "data": payload})
         except Exception: pass
 
     def progress(self, index: int, track: Track, elapsed: float, total: float, real_total: float) -> None:
-        track_data = {"path": str(track.path), "fade_out": track.fade_out, "fade_in": track.fade_in, "official": track.official, "args": track.args, "offset": track.offset, "focus_time_offset": track.focus_time_offset}
-        payload = {"index": index, "track": track_data, "elapsed": elapsed, "total": total, "real_total": real_total}
-        self.data["progress"] = json.dumps(payload)
-        try: self.ws_q.put({"event": "progress", "data": payload})
+        if not self.client_count.value: return
+        # The track stays the same for every tick of a song, so its encoding is only done once
+        if not self.progress_track or self.progress_track[0] is not track: self.progress_track = (track, json.dumps(track_to_api(track)))
+        payload = f'{{"index": {index}, "track": {self.progress_track[1]}, "elapsed": {elapsed!r}, "total": {total!r}, "real_total": {real_total!r}}}'
+        try: self.ws_q.put(f'{{"event": "progress", "data": {payload}}}')
         except Exception: pass
 
     def imc_data(self, source: BaseIMCModule, source_name: str | None, data: object, broadcast: bool) -> object:
@@ -365,11 +406,15 @@ class Module(PlayerModule):
         try: self.ws_q.put(None)
         except: pass
 
+        try: self.imc_r_q.put(None)
+        except: pass
+
         self.ipc_thread.join(timeout=1)
         self.ws_process.join(timeout=1)
 
         self.imc_q.close()
         self.ws_q.close()
+        self.imc_r_q.close()
 
         if self.ws_process.is_alive():
             self.ws_process.terminate()
@@ -381,6 +426,7 @@ class Module(PlayerModule):
 
         self.imc_q.join_thread()
         self.ws_q.join_thread()
+        self.imc_r_q.join_thread()
 
 module = Module()
 
@@ -1,18 +1,27 @@
 #!/usr/bin/env python3
 import os, importlib.util, importlib.machinery, types
-import sys, signal, time, traceback
+import sys, signal, time, traceback, select, threading, subprocess
 import concurrent.futures
 from modules import *
-from threading import Lock
 
-def prefetch(path):
-    if os.name == "posix":
-        try:
-            with open(path, "rb") as f:
+def prefetch(path) -> bool:
+    """Asks the kernel to read the file ahead, returns if the file is there (it had to be opened anyway, so this spares the exists check)"""
+    if os.name != "posix": return os.path.exists(path)
+    try:
+        with open(path, "rb") as f:
+            try:
                 fd = f.fileno()
                 os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
                 os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
-        except Exception: pass
+            except Exception: pass
+    except OSError: return False
+    return True
+
+def warmup(procman: ABC_ProcessManager, paths: list[Path]):
+    # On Linux the niceness is per thread, this keeps the header reads behind the player and the ffplay it starts
+    try: os.nice(10)
+    except (AttributeError, OSError): pass
+    procman.bulk_durations(paths)
 
 MODULES_PACKAGE = "modules"
 MODULES_DIR = Path(__file__, "..", MODULES_PACKAGE).resolve()
@@ -32,26 +41,22 @@ class ModuleManager:
                 except BaseException: traceback.print_exc(file=self.logger.output)
     def load_modules(self):
         """Loads the modules into memory"""
-        for file in MODULES_DIR.glob("*"):
-            if file.name.endswith(".py") and file.name != "__init__.py":
-                module_name = file.name[:-3]
-                full_module_name = f"{MODULES_PACKAGE}.{module_name}"
-
-                spec = importlib.util.spec_from_file_location(full_module_name, Path(MODULES_DIR, file))
-                module = importlib.util.module_from_spec(spec) if spec else None
-                assert spec and module
-
-                sys.modules[full_module_name] = module
-                if MODULES_PACKAGE not in sys.modules:
-                    parent = types.ModuleType(MODULES_PACKAGE)
-                    parent.__path__ = [str(MODULES_DIR)]
-                    parent.__package__ = MODULES_PACKAGE
-                    sys.modules[MODULES_PACKAGE] = parent
-                module.__package__ = MODULES_PACKAGE
-
-                module._log_out = self.logger.output # type: ignore
-                module.__dict__['_log_out'] = self.logger.output
-                self.modules.append((spec, module, module_name))
+        with os.scandir(MODULES_DIR) as it: filenames = [entry.name for entry in it if entry.name.endswith(".py") and entry.name != "__init__.py" and entry.is_file()]
+        for filename in sorted(filenames): # Sorted so modules load (and register) in the same order on every start
+            module_name = filename[:-3]
+            full_module_name = f"{MODULES_PACKAGE}.{module_name}"
+
+            # Resolved through the package's path finder, which lists the directory once and reuses the cached bytecode in __pycache__
+            spec = importlib.machinery.PathFinder.find_spec(full_module_name, [str(MODULES_DIR)])
+            module = importlib.util.module_from_spec(spec) if spec else None
+            assert spec and module
+
+            sys.modules[full_module_name] = module # The parent package is already imported, by the star import at the top
+            module.__package__ = MODULES_PACKAGE
+
+            module._log_out = self.logger.output # type: ignore
+            module.__dict__['_log_out'] = self.logger.output
+            self.modules.append((spec, module, module_name))
     def start_modules(self, arg):
         procman = None
         parser = None
@@ -136,7 +141,6 @@ class RadioPlayer:
     def __init__(self, arg: str | None, output: log95.TextIO):
         self.exit_pending = False
         self.exit_status_code = self.intr_time = 0
-        self.exit_lock = Lock()
         self.parser: PlaylistParser | None = None
         self.procman: ABC_ProcessManager | None = None
         self.arg = arg
@@ -149,15 +153,16 @@ class RadioPlayer:
         self.logger.output.close()
 
     def handle_sigint(self, signum: int, frame: types.FrameType | None):
-        with self.exit_lock:
-            self.logger.info("Received CTRL+C (SIGINT)")
-            if (now := time.monotonic()) and ((now - self.intr_time) > 5):
-                self.intr_time = now
-                self.logger.info("Will quit on song end.")
-                self.exit_pending, self.exit_status_code = True, 130
-            else:
-                self.logger.warning("Force-Quit pending")
-                raise SystemExit(130)
+        # Python runs signal handlers on the main thread between bytecodes, so a second CTRL+C can interrupt this handler itself.
+        # A lock held here would deadlock that nested call, so the handler only uses plain reads and writes
+        self.logger.info("Received CTRL+C (SIGINT)")
+        if ((now := time.monotonic()) - self.intr_time) > 5:
+            self.intr_time = now
+            self.logger.info("Will quit on song end.")
+            self.exit_pending, self.exit_status_code = True, 130
+        else:
+            self.logger.warning("Force-Quit pending")
+            raise SystemExit(130)
 
     def start(self):
         """Single functon for starting the core, returns but might exit raising a SystemExit"""
@@ -178,14 +183,20 @@ class RadioPlayer:
                 return
 
             playlist: list[Track] | None = []
+            cwd = os.getcwd()
+            seen: set[str] = set() # Overlapping entries (a file and a group holding it) would otherwise queue the same file twice
             for lines, args in parsed:
                 for line in lines:
-                    playlist.append(Track(Path(line).absolute(), 0, 0, True, args))
+                    if (path := line if os.path.isabs(line) else os.path.join(cwd, line)) in seen: continue
+                    seen.add(path)
+                    playlist.append(Track(Path(path), 0, 0, True, args))
 
             for module in filter(None, self.modman.playlist_modifier_modules): playlist = module.modify(global_args, playlist) or playlist
             assert len(playlist)
 
             prefetch(playlist[0].path)
+            # Durations of the whole playlist are read ahead on a side thread, so new files don't hold up the switch between tracks
+            threading.Thread(target=warmup, args=(self.procman, [track.path for track in playlist]), daemon=True).start()
             for module in filter(None, self.modman.simple_modules + [self.modman.active_modifier]): module.on_new_playlist(playlist, global_args)
 
             max_iterator = len(playlist)
@@ -196,13 +207,14 @@ class RadioPlayer:
         running = True
         return_pending = track = False
         song_i = i = 0
+        playlist_len = len(playlist) if playlist else 0 # The playlist is final once modified, so its length is taken once
         def get_track():
-            nonlocal song_i, playlist, max_iterator
+            nonlocal song_i, max_iterator
             track = None
             while track is None:
                 if playlist:
-                    playlist_track = playlist[song_i % len(playlist)]
-                    playlist_next_track = playlist[song_i + 1] if song_i + 1 < len(playlist) else None
+                    playlist_track = playlist[song_i % playlist_len]
+                    playlist_next_track = playlist[song_i + 1] if song_i + 1 < playlist_len else None
                 else: playlist_track = playlist_next_track = None
                 if self.modman.active_modifier:
                     (track, next_track), extend = self.modman.active_modifier.play(song_i, playlist_track, playlist_next_track)
@@ -230,46 +242,61 @@ class RadioPlayer:
                 running = False
 
         track, next_track, extend = get_track()
+        track_exists = prefetch(track.path)
+        # The conditions are checked here once and then at the end of every iteration, right before the next track is picked
+        check_conditions()
         while i < max_iterator and running:
-            check_conditions()
-            if not running: break
-
-            self.procman.anything_playing()
-
-            if not track.path.exists():
+            if not track_exists:
                 track, next_track, extend = get_track()
-                prefetch(track.path)
+                track_exists = prefetch(track.path)
                 i += 1
                 if not extend: song_i += 1
                 self.logger.warning("File does not exist:", str(track.path))
+                check_conditions()
                 continue
 
             self.logger.info("Now playing:", track.path.name)
-            prefetch(track.path)
 
             try:
                 pr = self.procman.play(track)
                 [module.on_new_track(song_i, pr.track, next_track) for module in self.modman.simple_modules if module]
+                # Tracks from the active modifier weren't in the playlist warmup, this has their duration ready before the switch
+                if next_track: threading.Thread(target=self.procman.duration, args=(next_track.path.absolute(),), daemon=True).start()
                 end_time = pr.started_at + pr.duration + pr.track.focus_time_offset
-                self.procman.anything_playing()
 
-                while end_time >= time.monotonic() and pr.process.poll() is None:
-                    start = time.monotonic()
-                    [module.progress(song_i, track, time.monotonic() - pr.started_at, pr.duration, end_time - pr.started_at) for module in self.modman.simple_modules if module]
-                    if (elapsed := time.monotonic() - start) < 1 and (remaining_until_end := end_time - time.monotonic()) > 0: time.sleep(min(1 - elapsed, remaining_until_end))
+                started_at, duration, total = pr.started_at, pr.duration, end_time - pr.started_at
+                progress_calls = [module.progress for module in self.modman.simple_modules if module and type(module).progress is not PlayerModule.progress] # Bound once per track
+                # Waiting on a pidfd lets a player that exits early (crashed or skipped) end the wait right away
+                try: pidfd = os.pidfd_open(pr.process.pid)
+                except (AttributeError, OSError): pidfd = None
+                # Without any module overriding progress there's nothing to tick, so the pidfd is waited on until the track ends
+                tick = 1 if progress_calls or pidfd is None else end_time
+                monotonic = time.monotonic
+                try:
+                    # With a pidfd the exit is seen by select itself, so only the sleeping fallback polls the player every tick
+                    while (now := monotonic()) <= end_time and (pidfd is not None or pr.process.poll() is None):
+                        for progress in progress_calls: progress(song_i, track, now - started_at, duration, total)
+                        if (remaining := min(now + tick, end_time) - monotonic()) > 0:
+                            if pidfd is None:
+                                # Without a pidfd the player is waited on directly, so an early exit still ends the tick
+                                try: pr.process.wait(remaining)
+                                except subprocess.TimeoutExpired: pass
+                            elif select.select([pidfd], [], [], remaining)[0]: break
+                finally:
+                    if pidfd is not None: os.close(pidfd)
             except RejectedTrack: pass
             except BaseException: raise
 
-            self.procman.anything_playing()
             if next_track: prefetch(next_track.path)
             i += 1
             if not extend: song_i += 1
 
+            # Reaps the finished players once per track, right before check_conditions may wait on the rest
             self.procman.anything_playing()
             check_conditions()
             if not running: break
             track, next_track, extend = get_track()
-            prefetch(track.path)
+            track_exists = prefetch(track.path)
 
     def loop(self):
         """Main loop of the player. This does not return and may or not raise a SystemExit"""
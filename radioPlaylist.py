@@ -1,12 +1,10 @@
 #!/usr/bin/env python3
-import time
 import os
 import sys
 import termios
 import tty
 import signal
 import shutil
-import libcache
 import argparse
 from datetime import datetime
 from typing import List, Dict, Set, Tuple, Optional
@@ -18,6 +16,29 @@ FILES_DIR = Path("/home/user/mixes/")
 PLAYLISTS_DIR = Path("/home/user/playlists/")
 POLISH_INDICATORS = ("Polskie", "Dzem")
 
+# Terminal colors
+ANSI_RESET = "\033[0m"
+ANSI_GREEN = "\033[1;32m"
+ANSI_GREY = "\033[1;30m"
+ANSI_HIGHLIGHT = "\033[1;44m"
+
+def _build_row_prefixes(labels: str) -> Dict[str, Tuple[str, ...]]:
+    """Build the row prefix for every combination of playlist flags, indexed by highlight and then by a bitmask (first label is the highest bit)."""
+    prefixes = {}
+    for highlight in ("", ANSI_HIGHLIGHT):
+        prefixes[highlight] = tuple(
+            highlight + " ".join(f"[{ANSI_GREEN if mask & (1 << (len(labels) - 1 - i)) else ANSI_GREY}{label}{ANSI_RESET}{highlight}]" for i, label in enumerate(labels))
+            for mask in range(1 << len(labels))
+        )
+    return prefixes
+
+CUSTOM_ROW_PREFIXES = _build_row_prefixes("C")
+WEEKLY_ROW_PREFIXES = _build_row_prefixes("LMDN")
+
+class PlaylistEncodingError(Exception):
+    """A playlist line that can't be encoded as UTF-8, the argument is the line."""
+
+
 @dataclass
 class InterfaceState:
     last_header: Optional[str] = None
@@ -43,6 +64,11 @@ class FileItem:
     path: Path
     is_folder: bool
     _all_files_cache: Optional[Set[str]] = field(default=None, init=False, repr=False)
+    # Lowercased once here, search and letter jumps compare against it on every keystroke
+    name_lower: str = field(default="", init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.name_lower = self.name.lower()
 
     @property
     def display_name(self) -> str:
@@ -79,14 +105,17 @@ class FileManager:
         """Get all audio files and folders containing audio files as FileItem objects."""
         items = []
         try:
-            for entry in sorted(directory.glob("*")):
+            # scandir gets the entry types along with the names, so no stat per entry is needed (hidden entries are skipped like glob did)
+            with os.scandir(directory) as it:
+                entries = sorted((entry for entry in it if not entry.name.startswith(".")), key=lambda entry: entry.name)
+            for entry in entries:
                 if entry.is_dir():
                     # Create folder item
-                    item = FileItem(name=entry.name, path=entry / "*", is_folder=True)
+                    item = FileItem(name=entry.name, path=directory / entry.name / "*", is_folder=True)
                     items.append(item)
                 elif entry.is_file():
                     # Create file item
-                    item = FileItem(name=entry.name, path=entry, is_folder=False)
+                    item = FileItem(name=entry.name, path=directory / entry.name, is_folder=False)
                     items.append(item)
             return items
         except FileNotFoundError:
@@ -110,7 +139,7 @@ class SearchManager:
         has_chars = []
 
         for item in items:
-            item_name_lower = item.name.lower()
+            item_name_lower = item.name_lower
 
             if item_name_lower.startswith(search_lower):
                 starts_with.append(item)
@@ -156,88 +185,97 @@ class PlaylistManager:
         self.periods = ['late_night', 'morning', 'day', 'night']
         self.config = config
         self.custom_playlist_files = set()
+        self.created_dirs: Set[str] = set()
+        # Directory pattern -> (directory mtime, expanded paths), the same folders repeat across every day and period
+        self.dir_pattern_cache: Dict[str, Tuple[int, Set[str]]] = {}
 
     def ensure_playlist_dir(self, day: str) -> Path:
         """Ensure playlist directory exists for the given day."""
         playlist_dir = PLAYLISTS_DIR / day
-        playlist_dir.mkdir(parents=True, exist_ok=True)
+        # Only the first call per day has to reach the filesystem
+        if day not in self.created_dirs:
+            playlist_dir.mkdir(parents=True, exist_ok=True)
+            self.created_dirs.add(day)
         return playlist_dir
 
+    def _expand_dir_pattern(self, dir_path: str) -> Set[str]:
+        """Files directly inside a directory as paths relative to FILES_DIR, listed again only once the directory changes."""
+        try:
+            mtime = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return set()
+        cached = self.dir_pattern_cache.get(dir_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        rel_paths = set()
+        for file in Path(dir_path).glob("*"):
+            if file.is_file():
+                try:
+                    rel_paths.add(str(file.relative_to(FILES_DIR)))
+                except ValueError:
+                    pass
+        self.dir_pattern_cache[dir_path] = (mtime, rel_paths)
+        return rel_paths
+
+    def _read_playlist_file(self, playlist_file: Path) -> Set[str]:
+        """Read a playlist file into a set of paths relative to FILES_DIR, expanding directory patterns."""
+        rel_paths = set()
+        try:
+            # Read the whole file at once instead of iterating it line by line
+            with open(playlist_file, 'r') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return rel_paths
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            # Check if it's a directory pattern
+            if line.endswith("/*"):
+                # It's a directory pattern - expand it to individual files
+                rel_paths.update(self._expand_dir_pattern(line[:-2]))  # Remove /*
+            else:
+                # Individual file
+                try:
+                    rel_paths.add(str(Path(line).relative_to(FILES_DIR)))
+                except ValueError:
+                    # If it's already relative, use as is
+                    rel_paths.add(line)
+        return rel_paths
+
     def load_playlists(self, days: List[str]) -> Dict[str, Dict[str, Set[str]]]:
         """Load all playlists from disk."""
         if self.config.is_custom_mode and self.config.custom_playlist_file:
             # In custom mode, we only need one "day" entry
             playlists = {"custom": {period: set() for period in self.periods}}
             # Load existing custom playlist if it exists
-            custom_path = Path(self.config.custom_playlist_file)
-            if custom_path.exists():
-                with open(custom_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            # Check if it's a directory pattern
-                            if line.endswith("/*"):
-                                # It's a directory pattern - expand it to individual files
-                                dir_path = Path(line[:-2])  # Remove /*
-                                if dir_path.exists():
-                                    for file in sorted(dir_path.glob("*")):
-                                        if file.is_file():
-                                            try:
-                                                rel_path = str(file.relative_to(FILES_DIR))
-                                                self.custom_playlist_files.add(rel_path)
-                                                playlists["custom"]["day"].add(rel_path)
-                                            except ValueError:
-                                                pass
-                            else:
-                                # Individual file
-                                abs_path = Path(line)
-                                try:
-                                    rel_path = str(abs_path.relative_to(FILES_DIR))
-                                except ValueError:
-                                    # If it's already relative, use as is
-                                    rel_path = line
-                                
-                                self.custom_playlist_files.add(rel_path)
-                                playlists["custom"]["day"].add(rel_path)
+            rel_paths = self._read_playlist_file(Path(self.config.custom_playlist_file))
+            self.custom_playlist_files.update(rel_paths)
+            playlists["custom"]["day"].update(rel_paths)
             return playlists
         else:
             # Original functionality for weekly playlists
             playlists = {}
             for day in days:
-                playlists[day] = {period: set() for period in self.periods}
                 playlist_dir = PLAYLISTS_DIR / day
-
-                if playlist_dir.exists():
-                    for period in self.periods:
-                        playlist_file = playlist_dir / period
-                        if playlist_file.exists():
-                            with open(playlist_file, 'r') as f:
-                                for line in f:
-                                    line = line.strip()
-                                    if line:
-                                        # Check if it's a directory pattern
-                                        if line.endswith("/*"):
-                                            # It's a directory pattern - expand it to individual files
-                                            dir_path = Path(line[:-2])  # Remove /*
-                                            if dir_path.exists():
-                                                for file in sorted(dir_path.glob("*")):
-                                                    if file.is_file():
-                                                        try:
-                                                            rel_path = str(file.relative_to(FILES_DIR))
-                                                            playlists[day][period].add(rel_path)
-                                                        except ValueError:
-                                                            pass
-                                        else:
-                                            # Individual file
-                                            abs_path = Path(line)
-                                            try:
-                                                rel_path = str(abs_path.relative_to(FILES_DIR))
-                                            except ValueError:
-                                                # If it's already relative, use as is
-                                                rel_path = line
-                                            playlists[day][period].add(rel_path)
+                playlists[day] = {period: self._read_playlist_file(playlist_dir / period) for period in self.periods}
             return playlists
 
+    @staticmethod
+    def _write_playlist_file(playlist_file: Path, data: bytes):
+        """Write the encoded playlist straight to the file descriptor, without going through a buffered file object."""
+        # Written next to the target and renamed over it, so the player never reads a truncated or half-written playlist
+        temp_file = playlist_file.with_name(f".{playlist_file.name}.tmp")
+        fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(temp_file, playlist_file)
+
     def update_playlist_file(self, day: str, period: str, file_item: FileItem, add: bool):
         """Update a playlist file by adding or removing files from a FileItem."""
         if self.config.is_custom_mode:
@@ -299,26 +337,24 @@ class PlaylistManager:
             else:
                 # Remove individual file
                 abs_path = str(file_item.path)
-                while abs_path in lines:
-                    lines.remove(abs_path)
+                lines = [line for line in lines if line != abs_path]
                 
                 # Update tracking set
                 for rel_path in file_item.all_files:
                     self.custom_playlist_files.discard(rel_path)
 
-        with open(custom_path, 'w') as f:
-            f.write('\n'.join(lines) + ('\n' if lines else ''))
+        self._write_playlist_file(custom_path, ('\n'.join(lines) + ('\n' if lines else '')).encode())
 
     def _update_weekly_playlist(self, day: str, period: str, file_item: FileItem, add: bool):
         """Update a weekly playlist file."""
         playlist_dir = self.ensure_playlist_dir(day)
         playlist_file = playlist_dir / period
 
-        if not playlist_file.exists():
-            playlist_file.touch()
-
-        with open(playlist_file, 'r') as f:
-            lines = f.read().splitlines()
+        try:
+            with open(playlist_file, 'r') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            lines = []
 
         if add:
             if file_item.is_folder:
@@ -348,17 +384,18 @@ class PlaylistManager:
             else:
                 # Remove individual file
                 abs_path = str(file_item.path)
-                while abs_path in lines:
-                    lines.remove(abs_path)
+                lines = [line for line in lines if line != abs_path]
 
-        with open(playlist_file, 'w', encoding='utf-8', errors='strict') as f:
-            for line in lines:
-                try:
-                    f.write(line + '\n')
-                except UnicodeEncodeError as e:
-                    print("⚠️ Encoding error in line:", repr(line))
-                    time.sleep(5)
-                    exit()
+        # Encode up front so a bad line is caught before the file is truncated
+        content = '\n'.join(lines) + ('\n' if lines else '')
+        try:
+            data = content.encode('utf-8', errors='strict')
+        except UnicodeEncodeError as e:
+            line = content[content.rfind('\n', 0, e.start) + 1:].split('\n', 1)[0]
+            # Reported by run() once the terminal is restored, printing here would be cleared before it is flushed
+            raise PlaylistEncodingError(line) from e
+
+        self._write_playlist_file(playlist_file, data)
 
     def is_file_item_in_playlist(self, file_item: FileItem, day: str, period: str, playlists: Dict) -> bool:
         """Check if ALL files in the item are in the playlist."""
@@ -370,20 +407,21 @@ class PlaylistManager:
         if self.config.is_custom_mode:
             return playlists
 
+        # The contents are the same for every target day, so build them once per period
+        contents = {}
+        for period in self.periods:
+            # Convert relative paths to absolute paths
+            filepaths = [str(FILES_DIR / rel_path) 
+                       for rel_path in playlists[source_day][period]]
+            contents[period] = ('\n'.join(filepaths) + ('\n' if filepaths else '')).encode()
+
         for target_day in days:
             if target_day == source_day:
                 continue
 
+            target_dir = self.ensure_playlist_dir(target_day)
             for period in self.periods:
-                target_dir = self.ensure_playlist_dir(target_day)
-                target_file = target_dir / period
-
-                # Convert relative paths to absolute paths
-                filepaths = [str(FILES_DIR / rel_path) 
-                           for rel_path in playlists[source_day][period]]
-
-                with open(target_file, 'w') as f:
-                    f.write('\n'.join(filepaths) + ('\n' if filepaths else ''))
+                self._write_playlist_file(target_dir / period, contents[period])
 
                 playlists[target_day][period] = set(playlists[source_day][period])
 
@@ -405,6 +443,7 @@ class PlaylistManager:
             if target_day == source_day:
                 continue
 
+            playlist_dir = self.ensure_playlist_dir(target_day)
             for period, is_present in source_periods.items():
                 target_set = playlists[target_day][period]
 
@@ -420,14 +459,14 @@ class PlaylistManager:
                         target_set.discard(rel_path)
 
                 # Update the playlist file
-                playlist_dir = self.ensure_playlist_dir(target_day)
                 playlist_file = playlist_dir / period
 
-                if playlist_file.exists():
+                try:
                     with open(playlist_file, 'r') as f:
-                        lines = [line.strip() for line in f.readlines()]
-                else:
+                        lines = list(map(str.strip, f))
+                except FileNotFoundError:
                     lines = []
+                original_lines = list(lines)
 
                 if is_present:
                     if current_item.is_folder:
@@ -455,46 +494,58 @@ class PlaylistManager:
                     else:
                         # Remove individual file
                         abs_path = str(current_item.path)
-                        while abs_path in lines:
-                            lines.remove(abs_path)
+                        lines = [line for line in lines if line != abs_path]
+
+                # Most days already match the source day, leave those files untouched
+                if lines == original_lines:
+                    continue
 
-                with open(playlist_file, 'w') as f:
-                    f.write('\n'.join(lines) + ('\n' if lines else ''))
+                self._write_playlist_file(playlist_file, ('\n'.join(lines) + ('\n' if lines else '')).encode())
 
         return playlists, True
 
 class TerminalUtils:
     @staticmethod
-    def get_char() -> str:
-        """Get a single character from stdin."""
+    def enter_raw_mode() -> list:
+        """Put the terminal into raw mode, returns the previous settings for restore_mode."""
         fd = sys.stdin.fileno()
         old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(sys.stdin.fileno())
-            ch = sys.stdin.read(1)
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return ch
+        tty.setraw(fd)
+        return old_settings
+
+    @staticmethod
+    def restore_mode(old_settings: list):
+        termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, old_settings)
+
+    @staticmethod
+    def get_char() -> str:
+        """Get a single character from stdin, the terminal has to be in raw mode."""
+        return sys.stdin.read(1)
 
     @staticmethod
     def clear_screen():
-        print("\033[2J\033[H", end="", flush=True)
+        sys.stdout.write("\033[2J\033[H")
 
     @staticmethod
     def move_cursor(row: int, col: int = 1):
-        print(f"\033[{row};{col}H", end="", flush=True)
+        sys.stdout.write(f"\033[{row};{col}H")
 
     @staticmethod
     def clear_line():
-        print("\033[2K", end="", flush=True)
+        sys.stdout.write("\033[2K")
 
     @staticmethod
     def hide_cursor():
-        print("\033[?25l", end="", flush=True)
+        sys.stdout.write("\033[?25l")
 
     @staticmethod
     def show_cursor():
-        print("\033[?25h", end="", flush=True)
+        sys.stdout.write("\033[?25h")
+
+    @staticmethod
+    def flush():
+        """Send everything drawn since the last flush to the terminal at once."""
+        sys.stdout.flush()
 
     @staticmethod
     def get_terminal_size() -> os.terminal_size:
@@ -530,7 +581,7 @@ class DisplayManager:
         if force_redraw or state.last_header != header_content:
             self.terminal.move_cursor(1)
             self.terminal.clear_line()
-            print(header_content.center(term_width), end="", flush=True)
+            print(header_content.center(term_width), end="")
 
             state.last_header = header_content
 
@@ -584,54 +635,32 @@ class DisplayManager:
             print(position_info.center(padding), end="")
 
             if end_idx < len(file_items):
-                print("↓", end="", flush=True)
+                print("↓", end="")
             else:
-                print(" ", end="", flush=True)
+                print(" ", end="")
 
             # File list
-            for display_row, idx in enumerate(range(start_idx, end_idx)):
+            if self.config.is_custom_mode:
+                row_prefixes, max_filename_length = CUSTOM_ROW_PREFIXES, term_width - 6
+            else:
+                row_prefixes, max_filename_length = WEEKLY_ROW_PREFIXES, term_width - 15
+            # The playlist status of every visible item is already part of the display state
+            for display_row, (idx, status) in enumerate(zip(range(start_idx, end_idx), files_display_state[4])):
                 item = file_items[idx]
                 line_row = 7 + display_row
                 self.terminal.move_cursor(line_row)
                 self.terminal.clear_line()
 
-                if self.config.is_custom_mode:
-                    # In custom mode, only show 'C' for custom playlist
-                    in_custom = all(rel_path in playlists.get("custom", {}).get("day", set())
-                                  for rel_path in item.all_files)
-                    c_color = "\033[1;32m" if in_custom else "\033[1;30m"
-                    row_highlight = "\033[1;44m" if idx == selected_idx else ""
+                mask = 0
+                for in_playlist in status:
+                    mask = (mask << 1) | in_playlist
+                prefix = row_prefixes[ANSI_HIGHLIGHT if idx == selected_idx else ""][mask]
 
-                    max_filename_length = term_width - 6
-                    display_name = item.display_name
-                    if len(display_name) > max_filename_length:
-                        display_name = display_name[:max_filename_length-3] + "..."
+                display_name = item.display_name
+                if len(display_name) > max_filename_length:
+                    display_name = display_name[:max_filename_length-3] + "..."
 
-                    print(f"{row_highlight}[{c_color}C\033[0m{row_highlight}] {display_name}\033[0m", end="", flush=True)
-                else:
-                    # Original weekly mode display
-                    in_late_night = all(rel_path in playlists[current_day]['late_night']
-                                      for rel_path in item.all_files)
-                    in_morning = all(rel_path in playlists[current_day]['morning']
-                                   for rel_path in item.all_files)
-                    in_day = all(rel_path in playlists[current_day]['day']
-                               for rel_path in item.all_files)
-                    in_night = all(rel_path in playlists[current_day]['night']
-                                 for rel_path in item.all_files)
-
-                    l_color = "\033[1;32m" if in_late_night else "\033[1;30m"
-                    m_color = "\033[1;32m" if in_morning else "\033[1;30m"
-                    d_color = "\033[1;32m" if in_day else "\033[1;30m"
-                    n_color = "\033[1;32m" if in_night else "\033[1;30m"
-
-                    row_highlight = "\033[1;44m" if idx == selected_idx else ""
-
-                    max_filename_length = term_width - 15
-                    display_name = item.display_name
-                    if len(display_name) > max_filename_length:
-                        display_name = display_name[:max_filename_length-3] + "..."
-
-                    print(f"{row_highlight}[{l_color}L\033[0m{row_highlight}] [{m_color}M\033[0m{row_highlight}] [{d_color}D\033[0m{row_highlight}] [{n_color}N\033[0m{row_highlight}] {display_name}\033[0m", end="", flush=True)
+                print(f"{prefix} {display_name}{ANSI_RESET}", end="")
 
             # Clear remaining lines
             last_end_idx = state.last_files_display[1] if state.last_files_display else 0
@@ -663,7 +692,6 @@ class Application:
         self.playlist_manager = PlaylistManager(config)
         self.terminal = TerminalUtils()
         self.display = DisplayManager(self.terminal, config)
-        self.terminal_cache = libcache.Cache()
         self.state = InterfaceState()
 
         # Application state
@@ -682,15 +710,30 @@ class Application:
         self.days_of_week = []
 
         self.redraw = False
+        self.term_size: Optional[os.terminal_size] = None
+        self.resized = False
 
     def setup_signal_handler(self):
         """Setup signal handler for graceful exit."""
         def signal_handler(sig, frame):
             self.terminal.show_cursor()
             self.terminal.clear_screen()
+            self.terminal.flush()
             sys.exit(0)
 
+        def resize_handler(sig, frame):
+            # Drop the cached size, the next draw queries it again and redraws everything
+            self.term_size = None
+            self.resized = True
+
         signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGWINCH, resize_handler)
+
+    def get_terminal_size(self) -> os.terminal_size:
+        """Get the terminal size, only queried again after the terminal was resized."""
+        if self.term_size is None:
+            self.term_size = self.terminal.get_terminal_size()
+        return self.term_size
 
     def initialize_data(self):
         """Initialize application data."""
@@ -727,12 +770,10 @@ class Application:
 
     def draw_interface(self, force_redraw: bool = False):
         """Draw the complete interface."""
-        term_width, term_height = self.terminal_cache.getElement("width", False), self.terminal_cache.getElement("height", False)
-        if term_width is None or term_height is None:
-            term_width, term_height = self.terminal.get_terminal_size()
-            self.terminal_cache.saveElement("width", term_width, 5, False, True)
-            self.terminal_cache.saveElement("height", term_height, 5, False, True)
+        if self.resized:
+            self.resized = False
             force_redraw = True
+        term_width, term_height = self.get_terminal_size()
 
         current_day = self.days_of_week[self.current_day_idx]
 
@@ -744,12 +785,12 @@ class Application:
 
             self.terminal.move_cursor(2)
             if self.config.is_custom_mode:
-                print("UP/DOWN: Navigate | C: Toggle | /: Search | Q: Quit", end="", flush=True)
+                print("UP/DOWN: Navigate | C: Toggle | /: Search | Q: Quit", end="")
             else:
-                print("UP/DOWN: Navigate | D/N/L/M: Toggle | C: Copy day | F: Copy item | /: Search | Q: Quit", end="", flush=True)
+                print("UP/DOWN: Navigate | D/N/L/M: Toggle | C: Copy day | F: Copy item | /: Search | Q: Quit", end="")
 
             self.terminal.move_cursor(3)
-            print("ESC: Exit search | ENTER: Apply search", end="", flush=True)
+            print("ESC: Exit search | ENTER: Apply search", end="")
 
         # Draw header
         self.display.draw_header(self.current_day_idx,
@@ -768,14 +809,14 @@ class Application:
             self.terminal.move_cursor(6)
             self.terminal.clear_line()
             if self.flash_message:
-                print(f"\033[1;32m{self.flash_message}\033[0m", end="", flush=True)
+                print(f"\033[1;32m{self.flash_message}\033[0m", end="")
             self.state.last_message = self.flash_message
 
+        self.terminal.flush()
+
     def handle_navigation_key(self, key: str):
         """Handle navigation keys."""
-        term_width, term_height = self.terminal_cache.getElement("width", False), self.terminal_cache.getElement("height", False)
-        if term_width is None or term_height is None:
-            term_width, term_height = self.terminal.get_terminal_size()
+        term_width, term_height = self.get_terminal_size()
 
         visible_lines = term_height - 6
 
@@ -856,15 +897,20 @@ class Application:
 
         self.setup_signal_handler()
 
-        # Initial draw
-        self.draw_interface(force_redraw=True)
+        # Frames are flushed explicitly once they are fully drawn, not on every newline
+        sys.stdout.reconfigure(line_buffering=False) # pyright: ignore[reportAttributeAccessIssue]
 
+        # Raw mode stays on for the whole session rather than being toggled around every key read
+        old_settings = self.terminal.enter_raw_mode()
+
+        encoding_error = None
         try:
+            # Initial draw
+            self.draw_interface(force_redraw=True)
+
             while True:
                 # Update scroll offset
-                term_width, term_height = self.terminal_cache.getElement("width", False), self.terminal_cache.getElement("height", False)
-                if term_width is None or term_height is None:
-                    term_width, term_height = self.terminal.get_terminal_size()
+                term_width, term_height = self.get_terminal_size()
 
                 visible_lines = term_height - 6
 
@@ -880,7 +926,8 @@ class Application:
                     self.state.last_scroll_offset != self.scroll_offset or
                     self.flash_message != self.state.last_message or
                     self.state.last_search != self.search_term or
-                    self.redraw
+                    self.redraw or
+                    self.resized
                 )
 
                 if needs_redraw:
@@ -958,21 +1005,28 @@ class Application:
                     target_letter = key.lower()
                     found_idx = -1
                     for i in range(self.selected_idx + 1, len(self.filtered_file_items)):
-                        if self.filtered_file_items[i].name.lower().startswith(target_letter):
+                        if self.filtered_file_items[i].name_lower.startswith(target_letter):
                             found_idx = i
                             break
                     if found_idx == -1:
                         for i in range(0, self.selected_idx):
-                            if self.filtered_file_items[i].name.lower().startswith(target_letter):
+                            if self.filtered_file_items[i].name_lower.startswith(target_letter):
                                 found_idx = i
                                 break
                     if found_idx != -1:
                         self.selected_idx = found_idx
 
+        except PlaylistEncodingError as e:
+            encoding_error = e
         finally:
+            self.terminal.restore_mode(old_settings)
             self.terminal.show_cursor()
             self.terminal.clear_screen()
+            self.terminal.flush()
 
+        if encoding_error:
+            print("⚠️ Encoding error in line:", repr(encoding_error.args[0]))
+            return 1
         return 0
 
 
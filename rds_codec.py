@@ -17,7 +17,6 @@ Usage:
 
 import codecs
 from typing import Tuple
-import unidecode
 
 # ---------------------------------------------------------------------------
 # Mapping tables (from rdscharset.pdf, R22_039_1 standard)
@@ -255,6 +254,19 @@ _RDS_TO_UCS2: dict[int, int] = {
 # Reverse map: Unicode code point -> RDS byte
 _UCS2_TO_RDS: dict[int, int] = {v: k for k, v in _RDS_TO_UCS2.items()}
 
+# Unmappable character -> RDS byte of its transliteration, filled as characters are met
+_REPLACEMENTS: dict[str, int] = {}
+
+
+def _replacement(ch: str) -> int:
+    """RDS byte substituted for an unmappable character, unidecode runs only once per distinct character."""
+    rds = _REPLACEMENTS.get(ch)
+    if rds is None:
+        import unidecode  # imported on the first unmappable character only, plain text never loads it
+        translit = unidecode.unidecode(ch, "replace", " ")
+        rds = _REPLACEMENTS[ch] = _UCS2_TO_RDS.get(ord(translit[0]), 0x20) if translit else 0x20  # substitute with space
+    return rds
+
 
 # ---------------------------------------------------------------------------
 # Codec implementation
@@ -296,9 +308,7 @@ def _rds_encode(text: str, errors: str = 'strict') -> Tuple[bytes, int]:
                     f'U+{ord(ch):04X} ({ch!r}) has no RDS mapping'
                 )
             elif errors == 'replace':
-                rds2 = _UCS2_TO_RDS.get(ord(unidecode.unidecode(ch, "replace", " ")))
-                if rds2 is not None: out.append(rds2)
-                else: out.append(0x20)   # substitute with space
+                out.append(_replacement(ch))
             elif errors == 'ignore':
                 pass
             else: